@@ -6,9 +6,66 @@ This package provides a set of tools for using local LLMs to assist with
 coding tasks through natural language, while keeping all data on your machine.
 """
 
-# Import version
-from ._version import __version__ as __version__
+import importlib
+import os
+from collections.abc import Callable
+from typing import Any
 
-# Define package metadata
-__author__ = "Ben H Moore"
-__email__ = "ben@benhmoore.com"
+
+def _attach(
+    package_name: str,
+    submodules: list[str],
+    submod_attrs: dict[str, list[str]],
+) -> tuple[Callable[[str], Any], Callable[[], list[str]], list[str]]:
+    """Build lazy `__getattr__`/`__dir__`/`__all__` for a package.
+
+    Submodules and the attributes they re-export are imported on first
+    attribute access instead of at package import time. Set EAGER_IMPORT=1
+    to resolve everything up front (useful when debugging import errors).
+
+    Args:
+        package_name: The name of the package being populated
+        submodules: Submodule names exposed as package attributes
+        submod_attrs: Mapping of submodule name to the attributes it re-exports
+
+    Returns:
+        Tuple of (__getattr__, __dir__, __all__)
+    """
+    attr_to_module = {
+        attr: module for module, attrs in submod_attrs.items() for attr in attrs
+    }
+    public_names = sorted(set(submodules) | set(attr_to_module))
+
+    def _getattr(name: str) -> Any:
+        package = importlib.import_module(package_name)
+        if name in submodules:
+            value = importlib.import_module(f"{package_name}.{name}")
+        elif name in attr_to_module:
+            module = importlib.import_module(
+                f"{package_name}.{attr_to_module[name]}",
+            )
+            value = getattr(module, name)
+        else:
+            raise AttributeError(
+                f"module {package_name!r} has no attribute {name!r}",
+            )
+        setattr(package, name, value)
+        return value
+
+    def _dir() -> list[str]:
+        return list(public_names)
+
+    if os.environ.get("EAGER_IMPORT", ""):
+        for name in public_names:
+            _getattr(name)
+
+    return _getattr, _dir, list(public_names)
+
+
+__getattr__, __dir__, __all__ = _attach(
+    __name__,
+    submodules=["agent", "config", "tools", "trust"],
+    submod_attrs={
+        "_version": ["__version__", "__author__", "__email__"],
+    },
+)
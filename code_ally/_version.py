@@ -1,3 +1,5 @@
 """Version information."""
 
 __version__ = "0.6.0"
+__author__ = "Ben H Moore"
+__email__ = "ben@benhmoore.com"
@@ -2,10 +2,33 @@
 Agent subpackage for Code Ally - Local LLM-powered pair programming assistant.
 
 Contains classes and modules that handle conversation flow, UI, and tools.
+The exported classes are resolved on first access, so importing a single
+submodule (e.g. ``code_ally.agent.permission_manager``) does not pull in the
+full agent, UI and LLM client stack.
 """
 
+import importlib
+from typing import Any
+
 __all__ = ["Agent", "PermissionManager", "ToolManager"]
 
-from .agent import Agent
-from .permission_manager import PermissionManager
-from .tool_manager import ToolManager
+_LAZY = {
+    "Agent": "code_ally.agent.agent",
+    "PermissionManager": "code_ally.agent.permission_manager",
+    "ToolManager": "code_ally.agent.tool_manager",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve exported classes on first access."""
+    if name in _LAZY:
+        module = importlib.import_module(_LAZY[name])
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    """Include lazily exported names in dir()."""
+    return sorted(list(globals()) + list(_LAZY))
@@ -0,0 +1,561 @@
+"""File: _task_planner_core.py.
+
+Pure functions behind the task planner's validation, condition and template
+handling. They only work on plain dicts, lists and strings and are fully
+annotated, so this module can be compiled (e.g. with mypyc) on its own.
+"""
+
+import functools
+import graphlib
+import heapq
+import operator
+import sys
+from collections.abc import Callable, Collection
+from typing import Any, NamedTuple
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_template(text: str) -> tuple[tuple[str, str | None], ...]:
+    """Split a template string into (literal, variable name) segments.
+
+    The placeholder scan runs once per distinct string; rendering then only
+    joins the precomputed segments. The final segment has no variable.
+    """
+    segments: list[tuple[str, str | None]] = []
+    pos = 0
+    while True:
+        start = text.find("${", pos)
+        if start == -1:
+            break
+        end = text.find("}", start + 2)
+        if end == -1:
+            break
+        segments.append((text[pos:start], text[start + 2 : end]))
+        pos = end + 1
+    segments.append((text[pos:], None))
+    return tuple(segments)
+
+
+class ResolvedVars(dict[str, str | None]):
+    """Template variable values, resolved on first use and then reused.
+
+    Variables that no argument references are never resolved, so e.g. a
+    large task result is not serialized unless a placeholder needs it.
+    """
+
+    def __init__(self, resolve: Callable[[str], str | None]) -> None:
+        """Initialize the mapping.
+
+        Args:
+            resolve: Returns a variable's value, or None if it has none
+        """
+        super().__init__()
+        self._resolve = resolve
+
+    def __missing__(self, name: str) -> str | None:
+        """Resolve and remember a variable the first time it is looked up."""
+        value = self[name] = self._resolve(name)
+        return value
+
+
+def render_template(text: str, resolved: ResolvedVars) -> str:
+    """Substitute `${name}` placeholders in a string.
+
+    Placeholders without a resolved value are left untouched.
+    """
+    if "${" not in text:
+        return text
+
+    segments = compile_template(text)
+    if len(segments) == 1:
+        return text
+
+    parts = []
+    for literal, var_name in segments:
+        parts.append(literal)
+        if var_name is None:
+            continue
+        replacement = resolved[var_name]
+        parts.append(f"${{{var_name}}}" if replacement is None else replacement)
+    return "".join(parts)
+
+
+@functools.lru_cache(maxsize=256)
+def split_field_path(field: str) -> tuple[str, ...]:
+    """Split a dot-separated result field path into its keys."""
+    return tuple(field.split("."))
+
+
+def lookup_field(value: Any, field: str, default: Any) -> Any:
+    """Follow a dot-separated field path through nested result dicts.
+
+    Returns the default as soon as a key along the path is missing.
+    """
+    for key in split_field_path(field):
+        if isinstance(value, dict) and key in value:
+            value = value[key]
+        else:
+            return default
+    return value
+
+
+def has_placeholder(value: Any) -> bool:
+    """Check whether a string, or any string nested in dicts/lists, has `${`."""
+    if isinstance(value, str):
+        return "${" in value
+    if isinstance(value, dict):
+        return any(has_placeholder(item) for item in value.values())
+    if isinstance(value, list):
+        return any(has_placeholder(item) for item in value)
+    return False
+
+
+def substitute_template_vars(
+    arguments: dict[str, Any],
+    resolved: ResolvedVars,
+) -> dict[str, Any]:
+    """Recursively substitute resolved template variables into arguments."""
+    processed_args: dict[str, Any] = {}
+    handlers_get = _SUBSTITUTION_HANDLERS.get
+
+    for key, value in arguments.items():
+        handler = handlers_get(type(value))
+        processed_args[key] = handler(value, resolved) if handler else value
+
+    return processed_args
+
+
+def _substitute_list(
+    items: list[Any],
+    resolved: ResolvedVars,
+) -> list[Any]:
+    """Substitute resolved template variables into list items."""
+    handlers_get = _SUBSTITUTION_HANDLERS.get
+    processed_list: list[Any] = []
+    for item in items:
+        handler = handlers_get(type(item))
+        processed_list.append(handler(item, resolved) if handler else item)
+    return processed_list
+
+
+# Argument values come from JSON, so exact type lookups replace isinstance
+# chains; any other type is passed through unchanged
+_SUBSTITUTION_HANDLERS: dict[type, Callable[[Any, ResolvedVars], Any]] = {
+    str: render_template,
+    dict: substitute_template_vars,
+    list: _substitute_list,
+}
+
+
+def block_dependents(
+    task_id: str,
+    dependents: dict[str, list[str]],
+    blocked: set[str],
+) -> None:
+    """Mark every task downstream of a failed task as blocked."""
+    stack = [task_id]
+    while stack:
+        current = stack.pop()
+        for dependent_id in dependents.get(current, ()):
+            if dependent_id not in blocked:
+                blocked.add(dependent_id)
+                stack.append(dependent_id)
+
+
+def intern_task_keys(tasks: Any) -> None:
+    """Intern task IDs, tool names and dependency IDs in place.
+
+    These strings key every lookup made while a plan runs; interning lets
+    equal keys compare by identity. Values of unexpected types are left for
+    validation to report.
+    """
+    if not isinstance(tasks, list):
+        return
+
+    for task in tasks:
+        if not isinstance(task, dict):
+            continue
+
+        for field in ("id", "tool_name"):
+            value = task.get(field)
+            if isinstance(value, str):
+                task[field] = sys.intern(value)
+
+        depends_on = task.get("depends_on")
+        if isinstance(depends_on, list) and depends_on:
+            task["depends_on"] = [
+                sys.intern(dep_id) if isinstance(dep_id, str) else dep_id
+                for dep_id in depends_on
+            ]
+
+
+# Comparison used by task_result conditions; anything else means "equals"
+_CONDITION_OPERATORS: dict[str | None, Callable[[Any, Any], bool]] = {
+    "equals": operator.eq,
+    "not_equals": operator.ne,
+}
+
+
+def _evaluate_task_result_condition(
+    condition: dict[str, Any],
+    results: dict[str, Any],
+) -> bool:
+    """Compare a field of a previous task's result against an expected value."""
+    task_result = results.get(condition["task_id"])
+    if task_result is None:
+        return False
+
+    condition_get = condition.get
+    compare: Callable[[Any, Any], bool] = _CONDITION_OPERATORS.get(
+        condition_get("operator"),
+        operator.eq,
+    )
+    return compare(
+        task_result.get(condition_get("field", "success")),
+        condition_get("value", True),
+    )
+
+
+_CONDITION_HANDLERS: dict[str, Callable[[dict[str, Any], dict[str, Any]], bool]] = {
+    "task_result": _evaluate_task_result_condition,
+}
+
+
+def evaluate_condition(condition: dict[str, Any], results: dict[str, Any]) -> bool:
+    """Evaluate a task condition against previous results.
+
+    Args:
+        condition: The condition specification
+        results: Results of previous task executions
+
+    Returns:
+        Whether the condition is met; unknown condition types are never met
+    """
+    handler = _CONDITION_HANDLERS.get(condition["type"])
+    return handler(condition, results) if handler else False
+
+
+# Keys each template variable type must define
+_TEMPLATE_VAR_REQUIRED_KEYS: dict[Any, tuple[str, ...]] = {
+    "task_result": ("task_id",),
+    "static": ("value",),
+}
+
+
+def _check_template_vars(task_id: str, template_vars: Any) -> str | None:
+    """Check a task's template variable definitions.
+
+    Args:
+        task_id: ID of the task the variables belong to
+        template_vars: The task's 'template_vars' value
+
+    Returns:
+        An error message, or None if the definitions are valid
+    """
+    if not isinstance(template_vars, dict):
+        return f"Task '{task_id}' has invalid 'template_vars' (must be a dictionary)"
+
+    for var_name, var_def in template_vars.items():
+        if not isinstance(var_def, dict):
+            return (
+                f"Task '{task_id}' template variable '{var_name}' must be a dictionary"
+            )
+
+        required_keys = _TEMPLATE_VAR_REQUIRED_KEYS.get(var_def.get("type"))
+        if required_keys is None:
+            return (
+                f"Task '{task_id}' template variable '{var_name}' has invalid "
+                f"type '{var_def.get('type')}'"
+            )
+
+        for key in required_keys:
+            if key not in var_def:
+                return (
+                    f"Task '{task_id}' template variable '{var_name}' "
+                    f"missing '{key}' field"
+                )
+
+    return None
+
+
+class PlanIndex(NamedTuple):
+    """Lookups built while validating a plan, reused to execute it."""
+
+    tasks_by_id: dict[str, dict[str, Any]]
+    # Position of each task in the plan, used to order tasks within a layer
+    task_order: dict[str, int]
+    # Reverse dependency index: task ID -> IDs of tasks that depend on it
+    dependents: dict[str, list[str]]
+    # Task ID -> IDs of tasks that must wait for it: its dependents plus
+    # tasks whose condition or template variables read its result
+    waiters: dict[str, list[str]]
+    # Number of tasks each task waits for (its Kahn in-degree)
+    dep_count: dict[str, int]
+    # Task IDs in an order where every task follows its dependencies
+    topo_order: list[str]
+
+
+def release_dependents(
+    task_id: str,
+    plan_index: PlanIndex,
+    remaining: dict[str, int],
+    ready: list[tuple[tuple[float, int], str]],
+    sort_keys: dict[str, tuple[float, int]],
+) -> None:
+    """Count a finished task against its dependents' outstanding dependencies.
+
+    Dependents with no dependencies left are pushed onto the ready heap
+    under their sort key.
+    """
+    for dependent_id in plan_index.waiters.get(task_id, ()):
+        remaining[dependent_id] -= 1
+        if remaining[dependent_id] == 0:
+            heapq.heappush(ready, (sort_keys[dependent_id], dependent_id))
+
+
+def critical_path(
+    plan_index: PlanIndex,
+    durations: dict[str, float],
+) -> tuple[dict[str, float], float]:
+    """Compute the longest remaining path through the plan from each task.
+
+    Edges are relaxed in reverse topological order, so each task's value is
+    its own duration plus the longest chain of tasks that depend on it.
+
+    Args:
+        plan_index: Lookups built while validating the plan
+        durations: Expected duration of each task, in seconds
+
+    Returns:
+        Tuple of (remaining path length per task, total critical path length)
+    """
+    path_length: dict[str, float] = {}
+    for task_id in reversed(plan_index.topo_order):
+        longest_after = max(
+            (path_length[dep_id] for dep_id in plan_index.waiters.get(task_id, ())),
+            default=0.0,
+        )
+        path_length[task_id] = durations[task_id] + longest_after
+    return path_length, max(path_length.values(), default=0.0)
+
+
+# Plan-level options that must be integers when given
+_PLAN_INTEGER_KEYS = ("max_parallel", "history_limit")
+
+
+def check_plan(
+    plan: dict[str, Any],
+    tool_names: Collection[str],
+) -> tuple[bool, str | None]:
+    """Check a task plan for structural correctness.
+
+    Args:
+        plan: The task plan to check
+        tool_names: Names of the tools tasks may reference
+
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    is_valid, error, _ = index_plan(plan, tool_names)
+    return is_valid, error
+
+
+def index_plan(
+    plan: dict[str, Any],
+    tool_names: Collection[str],
+) -> tuple[bool, str | None, PlanIndex | None]:
+    """Check a task plan and build the lookups needed to execute it.
+
+    Args:
+        plan: The task plan to check
+        tool_names: Names of the tools tasks may reference
+
+    Returns:
+        Tuple of (is_valid, error_message, index); the index is None when the
+        plan is invalid
+    """
+    if "name" not in plan:
+        return False, "Plan missing 'name' field", None
+
+    if "description" not in plan:
+        return False, "Plan missing 'description' field", None
+
+    if "tasks" not in plan or not isinstance(plan["tasks"], list):
+        return False, "Plan missing 'tasks' list or 'tasks' is not a list", None
+
+    if not plan["tasks"]:
+        return False, "Plan contains no tasks", None
+
+    for key in _PLAN_INTEGER_KEYS:
+        value = plan.get(key)
+        if key in plan and (isinstance(value, bool) or not isinstance(value, int)):
+            return False, f"Plan has invalid '{key}' (must be an integer)", None
+
+    tasks_by_id: dict[str, dict[str, Any]] = {}
+    task_order: dict[str, int] = {}
+    dependency_graph: dict[str, list[str]] = {}
+    # (task_id, referenced_id, is_condition) pairs, checked once all IDs are known
+    references: list[tuple[str, str, bool]] = []
+    # Task ID -> IDs of tasks whose results its condition or template
+    # variables read
+    result_reads: dict[str, list[str]] = {}
+
+    for i, task in enumerate(plan["tasks"]):
+        if "id" not in task:
+            return False, f"Task at index {i} missing 'id' field", None
+
+        if "tool_name" not in task:
+            return False, f"Task at index {i} missing 'tool_name' field", None
+
+        task_id = task["id"]
+
+        if "arguments" in task and not isinstance(task["arguments"], dict):
+            return (
+                False,
+                f"Task '{task_id}' has invalid 'arguments' (must be a dictionary)",
+                None,
+            )
+
+        tasks_by_id[task_id] = task
+        task_order[task_id] = i
+
+        if task["tool_name"] not in tool_names:
+            return (
+                False,
+                f"Task '{task_id}' references unknown tool '{task['tool_name']}'",
+                None,
+            )
+
+        depends_on = task.get("depends_on", [])
+        if not isinstance(depends_on, list):
+            return (
+                False,
+                f"Task '{task_id}' has invalid 'depends_on' (must be a list)",
+                None,
+            )
+        dependency_graph[task_id] = depends_on
+        references.extend((task_id, dep_id, False) for dep_id in depends_on)
+
+        if "condition" in task:
+            condition = task["condition"]
+            if not isinstance(condition, dict):
+                return (
+                    False,
+                    f"Task '{task_id}' has invalid 'condition' (must be a dictionary)",
+                    None,
+                )
+
+            if "type" not in condition:
+                return False, f"Task '{task_id}' condition missing 'type' field", None
+
+            if condition["type"] == "expression":
+                return (
+                    False,
+                    f"Task '{task_id}' uses an 'expression' condition, which is not supported yet",
+                    None,
+                )
+
+            if condition["type"] != "task_result":
+                return (
+                    False,
+                    f"Task '{task_id}' has invalid condition type '{condition['type']}'",
+                    None,
+                )
+
+            if "task_id" not in condition:
+                return (
+                    False,
+                    f"Task '{task_id}' condition missing 'task_id' field",
+                    None,
+                )
+            references.append((task_id, condition["task_id"], True))
+            result_reads.setdefault(task_id, []).append(condition["task_id"])
+
+        if "template_vars" in task:
+            error = _check_template_vars(task_id, task["template_vars"])
+            if error:
+                return False, error, None
+            result_reads.setdefault(task_id, []).extend(
+                var_def["task_id"]
+                for var_def in task["template_vars"].values()
+                if var_def["type"] == "task_result"
+                and isinstance(var_def["task_id"], str)
+            )
+
+    for task_id, referenced_id, is_condition in references:
+        if referenced_id not in tasks_by_id:
+            if is_condition:
+                return (
+                    False,
+                    f"Task '{task_id}' condition references unknown task '{referenced_id}'",
+                    None,
+                )
+            return (
+                False,
+                f"Task '{task_id}' depends on unknown task '{referenced_id}'",
+                None,
+            )
+
+    # A task also waits for the tasks whose results it reads, so parallel
+    # runs never evaluate them early; unlike dependencies, their failure
+    # does not block it
+    dependents: dict[str, list[str]] = {}
+    waiters: dict[str, list[str]] = {}
+    wait_graph: dict[str, list[str]] = {}
+    dep_count: dict[str, int] = {}
+    for task_id, depends_on in dependency_graph.items():
+        for dep_id in depends_on:
+            dependents.setdefault(dep_id, []).append(task_id)
+
+        waits_for = list(dict.fromkeys(depends_on))
+        waits_for.extend(
+            read_id
+            for read_id in dict.fromkeys(result_reads.get(task_id, ()))
+            if read_id in tasks_by_id and read_id not in depends_on
+        )
+        wait_graph[task_id] = waits_for
+        dep_count[task_id] = len(waits_for)
+        for wait_id in waits_for:
+            waiters.setdefault(wait_id, []).append(task_id)
+
+    # Kahn's algorithm: every task is reachable from a task that waits for
+    # nothing unless the graph has a cycle
+    remaining = dict(dep_count)
+    ready = [task_id for task_id, count in remaining.items() if count == 0]
+    topo_order: list[str] = []
+    while ready:
+        current = ready.pop()
+        topo_order.append(current)
+        for waiter_id in waiters.get(current, ()):
+            remaining[waiter_id] -= 1
+            if remaining[waiter_id] == 0:
+                ready.append(waiter_id)
+
+    if len(topo_order) < len(remaining):
+        return (
+            False,
+            f"Circular dependency detected: {_find_cycle(wait_graph)}",
+            None,
+        )
+
+    return (
+        True,
+        None,
+        PlanIndex(
+            tasks_by_id,
+            task_order,
+            dependents,
+            waiters,
+            dep_count,
+            topo_order,
+        ),
+    )
+
+
+def _find_cycle(dependency_graph: dict[str, list[str]]) -> str:
+    """Describe one dependency cycle in a graph known to contain a cycle."""
+    try:
+        graphlib.TopologicalSorter(dependency_graph).prepare()
+    except graphlib.CycleError as e:
+        return " -> ".join(e.args[1])
+    return "unknown"
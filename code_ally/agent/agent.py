@@ -162,7 +162,7 @@ class Agent:
             was_interrupted = False
 
             # Clear the current turn's tool calls for follow-up responses
-            self.tool_manager.current_turn_tool_calls = []
+            self.tool_manager.reset_turn()
 
             try:
                 self.request_in_progress = True  # Signal that a request is starting
@@ -186,7 +186,10 @@ class Agent:
 
             if was_interrupted:
                 self.ui.stop_thinking_animation()
-                self.ui.print_content("[yellow]Request interrupted by user[/]")
+                self.ui.print_content(
+                    "[yellow]Request interrupted by user[/]",
+                    markup=True,
+                )
                 return
 
             if follow_up_response:
@@ -204,7 +207,10 @@ class Agent:
                 )
                 if was_interrupted:
                     self.ui.stop_thinking_animation()
-                    self.ui.print_content("[yellow]Request interrupted by user[/]")
+                    self.ui.print_content(
+                        "[yellow]Request interrupted by user[/]",
+                        markup=True,
+                    )
                     return
 
                 if self.ui.verbose:
@@ -524,7 +530,7 @@ class Agent:
             was_interrupted = False
 
             # Clear the current turn's tool calls at the start of each new conversation turn
-            self.tool_manager.current_turn_tool_calls = []
+            self.tool_manager.reset_turn()
 
             try:
                 self.request_in_progress = True
@@ -550,7 +556,10 @@ class Agent:
                 self.ui.stop_thinking_animation()
                 if animation_thread and animation_thread.is_alive():
                     animation_thread.join(timeout=1.0)
-                self.ui.print_content("[yellow]Request interrupted by user[/]")
+                self.ui.print_content(
+                    "[yellow]Request interrupted by user[/]",
+                    markup=True,
+                )
                 continue
 
             if response:
@@ -570,7 +579,10 @@ class Agent:
                 if was_interrupted:
                     self.ui.stop_thinking_animation()
                     animation_thread.join(timeout=1.0)
-                    self.ui.print_content("[yellow]Request interrupted by user[/]")
+                    self.ui.print_content(
+                        "[yellow]Request interrupted by user[/]",
+                        markup=True,
+                    )
                     continue
 
                 if self.ui.verbose:
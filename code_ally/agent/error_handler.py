@@ -90,8 +90,14 @@ def display_error(
     )
 
     # Use Rich formatting for the error note
-    ui_manager.print_content(f"[yellow bold]Error Note:[/] {formatted['error_note']}")
+    ui_manager.print_content(
+        f"[yellow bold]Error Note:[/] {formatted['error_note']}",
+        markup=True,
+    )
 
     # Display suggestion if available
     if formatted["possible_fix"]:
-        ui_manager.print_content(f"[blue]Possible fix:[/] {formatted['possible_fix']}")
+        ui_manager.print_content(
+            f"[blue]Possible fix:[/] {formatted['possible_fix']}",
+            markup=True,
+        )
@@ -1,5 +1,7 @@
 """Permission management for Code Ally tools."""
 
+from __future__ import annotations
+
 import logging
 import os
 import re
@@ -11,32 +13,62 @@ from code_ally.trust import (
     has_path_traversal_patterns,
 )
 
+__all__ = ["PermissionManager"]
+
 logger = logging.getLogger(__name__)
 
+# Argument names that carry the path a tool operates on, in priority order
+_PATH_ARGUMENT_KEYS = (
+    "path",
+    "file_path",
+    "directory",
+    "src",
+    "dest",
+    "source",
+    "destination",
+    "input",
+    "output",
+)
+
 
 class PermissionManager:
     """Manages permission checks for tools."""
 
+    __slots__ = (
+        "trust_manager",
+        "start_directory",
+        "allowed_paths",
+        "_batch_cache",
+        "_cache_batch_id",
+        "path_traversal_patterns",
+        "path_traversal_regexes",
+    )
+
     def __init__(self, trust_manager: TrustManager) -> None:
         """Initialize the permission manager."""
-        self.trust_manager = trust_manager
+        self.trust_manager: TrustManager = trust_manager
         # Store the starting directory at initialization time
-        self.start_directory = os.path.abspath(os.getcwd())
+        self.start_directory: str = os.path.abspath(os.getcwd())
         logger.info(
-            f"PermissionManager initialized with starting directory: {self.start_directory}",
+            "PermissionManager initialized with starting directory: %s",
+            self.start_directory,
         )
 
         # Create a set of allowed file paths (paths within the working directory)
-        self.allowed_paths = set()
+        self.allowed_paths: set[str] = set()
         self.allowed_paths.add(self.start_directory)
 
+        # Permission decisions cached for the duration of a single batch
+        self._batch_cache: dict[tuple[str, Any], bool] = {}
+        self._cache_batch_id: str | None = None
+
         # Initialize disallowed patterns
         self._initialize_path_restrictions()
 
     def _initialize_path_restrictions(self) -> None:
         """Initialize path restriction patterns."""
         # Pattern to detect common path traversal attempts
-        self.path_traversal_patterns = [
+        self.path_traversal_patterns: list[str] = [
             r"\.\.",
             r"\.\.\/",
             r"~\/",
@@ -58,12 +90,31 @@ class PermissionManager:
         ]
 
         # Compile regex patterns for efficiency
-        self.path_traversal_regexes = [
+        self.path_traversal_regexes: list[re.Pattern[str]] = [
             re.compile(pattern) for pattern in self.path_traversal_patterns
         ]
 
-    def check_permission(self, tool_name: str, arguments: dict[str, Any]) -> bool:
-        """Check if a tool has permission to execute."""
+    def check_permission(
+        self,
+        tool_name: str,
+        arguments: dict[str, Any],
+        batch_id: str | None = None,
+    ) -> bool:
+        """Check if a tool has permission to execute.
+
+        Args:
+            tool_name: The name of the tool being used
+            arguments: The arguments for the tool
+            batch_id: Optional batch identifier. Granted permissions are reused
+                for identical operations within the same batch.
+
+        Returns:
+            Whether permission was granted
+
+        Raises:
+            DirectoryTraversalError: If the operation escapes the working directory
+            PermissionDeniedError: If the user denies permission
+        """
         # Get permission path based on the tool and arguments
         permission_path = self._get_permission_path(tool_name, arguments)
 
@@ -73,15 +124,44 @@ class PermissionManager:
         # Verify the path is within allowed directory bounds
         self._verify_directory_access(tool_name, permission_path)
 
-        # Check if already trusted
-        if self.trust_manager.is_trusted(tool_name, permission_path):
-            logger.info(f"Tool {tool_name} is already trusted")
-            return True
+        # Drop cached decisions once a new batch starts
+        if batch_id != self._cache_batch_id:
+            self._batch_cache.clear()
+            self._cache_batch_id = batch_id
 
-        logger.info(f"Requesting permission for {tool_name}")
+        cache_key = None
+        if batch_id is not None:
+            cache_key = (tool_name, self._permission_cache_key(permission_path))
+            if self._batch_cache.get(cache_key):
+                return True
 
-        # Prompt for permission (this may raise PermissionDeniedError)
-        return self.trust_manager.prompt_for_permission(tool_name, permission_path)
+        # Check if already trusted
+        if self.trust_manager.is_trusted(tool_name, permission_path):
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Tool %s is already trusted", tool_name)
+            granted = True
+        else:
+            logger.info("Requesting permission for %s", tool_name)
+
+            # Prompt for permission (this may raise PermissionDeniedError)
+            granted = self.trust_manager.prompt_for_permission(
+                tool_name,
+                permission_path,
+            )
+
+        # Only positive decisions are cached; denials raise and must re-prompt
+        if cache_key is not None and granted:
+            self._batch_cache[cache_key] = True
+        return granted
+
+    @staticmethod
+    def _permission_cache_key(
+        permission_path: str | dict[str, str] | None,
+    ) -> Any:
+        """Build a hashable cache key for a permission path."""
+        if isinstance(permission_path, dict):
+            return ("command", permission_path.get("command"))
+        return permission_path
 
     def _check_all_arguments_for_traversal(
         self,
@@ -136,7 +216,10 @@ class PermissionManager:
                             raise
                         # If we can't parse it as a path, log and continue
                         logger.debug(
-                            f"Could not validate potential path in {tool_name} argument {arg_name}: {e}",
+                            "Could not validate potential path in %s argument %s: %s",
+                            tool_name,
+                            arg_name,
+                            e,
                         )
 
             # Check string arrays recursively
@@ -226,7 +309,7 @@ class PermissionManager:
         Returns:
             List of tuples containing (original_text, resolved_path)
         """
-        resolved_paths = []
+        resolved_paths: list[tuple[str, str]] = []
 
         # Look for potential paths in the string
         path_pattern = re.compile(r"(?:^|\s+)([\.\/\w\-~]+\/?[\w\-\.\/]+)(?:\s+|$)")
@@ -259,19 +342,10 @@ class PermissionManager:
         if tool_name == "bash" and "command" in arguments:
             return arguments
 
-        # For other tools, look for path arguments
-        for arg_name, arg_value in arguments.items():
-            if isinstance(arg_value, str) and arg_name in (
-                "path",
-                "file_path",
-                "directory",
-                "src",
-                "dest",
-                "source",
-                "destination",
-                "input",
-                "output",
-            ):
+        # For other tools, probe the known path arguments directly
+        for arg_name in _PATH_ARGUMENT_KEYS:
+            arg_value = arguments.get(arg_name)
+            if isinstance(arg_value, str):
                 return arg_value
 
         return None
@@ -4,12 +4,31 @@ Provides task planning capabilities for the Code Ally agent.
 Enables the agent to define, validate, and execute multi-step plans.
 """
 
+import heapq
 import json
 import logging
+import queue
+import threading
 import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any
 
 # Import only what we need at the module level
+from code_ally.agent._task_planner_core import (
+    PlanIndex,
+    ResolvedVars,
+    block_dependents,
+    check_plan,
+    critical_path,
+    evaluate_condition,
+    has_placeholder,
+    index_plan,
+    intern_task_keys,
+    lookup_field,
+    release_dependents,
+    substitute_template_vars,
+)
 from code_ally.agent.error_handler import display_error
 from code_ally.trust import PermissionDeniedError
 
@@ -18,6 +37,139 @@ ToolManager = Any  # Will be imported inside methods
 
 logger = logging.getLogger(__name__)
 
+# Default number of task entries kept in the execution history
+_DEFAULT_HISTORY_LIMIT = 1000
+
+# Assumed duration, in seconds, of a tool that has not been timed yet
+_DEFAULT_TASK_DURATION = 1.0
+
+# Weight of the newest sample in each tool's moving-average duration
+_DURATION_SMOOTHING = 0.3
+
+# Number of pure tool results kept for reuse within a plan run
+_RESULT_CACHE_SIZE = 256
+
+
+# JSON schema for task plans; built once since it never changes
+_PLAN_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "required": ["name", "tasks"],
+    "properties": {
+        "name": {"type": "string", "description": "Name of the task plan"},
+        "description": {
+            "type": "string",
+            "description": "Description of what the plan does",
+        },
+        "stop_on_failure": {
+            "type": "boolean",
+            "description": "Whether to stop execution if a task fails",
+            "default": False,
+        },
+        "max_parallel": {
+            "type": "integer",
+            "description": "Maximum number of independent tasks to run concurrently",
+            "default": 1,
+        },
+        "cacheable": {
+            "type": "boolean",
+            "description": "Whether identical read-only tool calls may reuse an earlier result",
+            "default": True,
+        },
+        "history_limit": {
+            "type": "integer",
+            "description": "Maximum number of task entries kept in the execution history",
+            "default": _DEFAULT_HISTORY_LIMIT,
+        },
+        "tasks": {
+            "type": "array",
+            "description": "List of tasks to execute",
+            "items": {
+                "type": "object",
+                "required": ["id", "tool_name"],
+                "properties": {
+                    "id": {
+                        "type": "string",
+                        "description": "Unique identifier for the task",
+                    },
+                    "tool_name": {
+                        "type": "string",
+                        "description": "Name of the tool to execute",
+                    },
+                    "description": {
+                        "type": "string",
+                        "description": "Description of what the task does",
+                    },
+                    "arguments": {
+                        "type": "object",
+                        "description": "Arguments to pass to the tool",
+                    },
+                    "depends_on": {
+                        "type": "array",
+                        "description": "List of task IDs that must complete before this task",
+                        "items": {"type": "string"},
+                    },
+                    "condition": {
+                        "type": "object",
+                        "description": "Condition that determines if this task should run",
+                        "properties": {
+                            "type": {
+                                "type": "string",
+                                "enum": ["task_result"],
+                                "description": "Type of condition to evaluate",
+                            },
+                            "task_id": {
+                                "type": "string",
+                                "description": "ID of task whose result to check (for task_result type)",
+                            },
+                            "field": {
+                                "type": "string",
+                                "description": "Field in the task result to check (default: 'success')",
+                            },
+                            "operator": {
+                                "type": "string",
+                                "enum": ["equals", "not_equals"],
+                                "default": "equals",
+                                "description": "Comparison operator",
+                            },
+                            "value": {
+                                "description": "Value to compare against",
+                            },
+                        },
+                    },
+                    "template_vars": {
+                        "type": "object",
+                        "description": "Template variables for argument substitution",
+                        "additionalProperties": {
+                            "type": "object",
+                            "properties": {
+                                "type": {
+                                    "type": "string",
+                                    "enum": ["task_result", "static"],
+                                    "description": "Source type for the variable",
+                                },
+                                "task_id": {
+                                    "type": "string",
+                                    "description": "ID of task whose result to use (for task_result type)",
+                                },
+                                "field": {
+                                    "type": "string",
+                                    "description": "Field path in the task result to use (dot notation)",
+                                },
+                                "value": {
+                                    "description": "Static value (for static type)",
+                                },
+                                "default": {
+                                    "description": "Default value to use if the source is unavailable",
+                                },
+                            },
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
+
 
 class TaskPlanner:
     """Task planner for efficiently executing multi-step tool operations.
@@ -40,10 +192,39 @@ class TaskPlanner:
             tool_manager: The tool manager instance for executing tools
         """
         self.tool_manager = tool_manager
-        self.execution_history: list[dict[str, Any]] = []
+        self.execution_history: deque[dict[str, Any]] = deque(
+            maxlen=_DEFAULT_HISTORY_LIMIT,
+        )
         self.ui = None  # Will be set by the Agent class
         self.verbose = False
 
+        # JSON text of whole task results used as template values, keyed by
+        # task ID and stored with the result it was built from
+        self._serialized_results: dict[str, tuple[dict[str, Any], str]] = {}
+
+        # Exponential moving average of each tool's run time, in seconds.
+        # Updated from worker threads, hence the lock.
+        self._tool_durations: dict[str, float] = {}
+        self._tool_durations_lock = threading.Lock()
+
+        # Results of pure (read-only) tool calls in the current plan run,
+        # keyed by tool name and canonical JSON arguments
+        self._result_cache: OrderedDict[tuple[str, str], dict[str, Any]] = OrderedDict()
+        self._result_cache_lock = threading.Lock()
+        self._cache_results = True
+        # Bumped whenever the cache is cleared, so a read that overlapped a
+        # write in a parallel plan does not store what it read before it
+        self._result_cache_generation = 0
+
+        # Live progress display of the running plan: (Live, rows, statuses)
+        self._progress: (
+            tuple[Any, list[tuple[str, str, str]], dict[str, str]] | None
+        ) = None
+
+        # Clock readings taken when the current plan started executing
+        self._start_wall_time = time.time()
+        self._start_perf_ns = time.perf_counter_ns()
+
         # Interactive planning state
         self.interactive_plan: dict[str, Any] | None = None
         self.interactive_plan_tasks: list[dict[str, Any]] = []
@@ -57,6 +238,24 @@ class TaskPlanner:
         """
         self.verbose = verbose
 
+    def _verbose_print(self, message: str, style: str) -> None:
+        """Print a verbose-mode message.
+
+        The message is printed as plain styled text, so it skips Rich's
+        markup parsing and highlighting and may safely contain brackets.
+
+        Args:
+            message: The message to print, without the "[Verbose]" prefix
+            style: Rich style for the whole line
+        """
+        if self.verbose and self.ui:
+            self.ui.console.print(
+                f"[Verbose] {message}",
+                style=style,
+                markup=False,
+                highlight=False,
+            )
+
     def validate_plan(self, plan: dict[str, Any]) -> tuple[bool, str | None]:
         """Validate a task plan for structural correctness.
 
@@ -66,99 +265,7 @@ class TaskPlanner:
         Returns:
             Tuple of (is_valid, error_message)
         """
-        if "name" not in plan:
-            return False, "Plan missing 'name' field"
-
-        if "description" not in plan:
-            return False, "Plan missing 'description' field"
-
-        if "tasks" not in plan or not isinstance(plan["tasks"], list):
-            return False, "Plan missing 'tasks' list or 'tasks' is not a list"
-
-        if not plan["tasks"]:
-            return False, "Plan contains no tasks"
-
-        tasks_by_id = {}
-        for i, task in enumerate(plan["tasks"]):
-            if "id" not in task:
-                return False, f"Task at index {i} missing 'id' field"
-
-            if "tool_name" not in task:
-                return False, f"Task at index {i} missing 'tool_name' field"
-
-            if "arguments" in task and not isinstance(task["arguments"], dict):
-                return (
-                    False,
-                    f"Task '{task['id']}' has invalid 'arguments' (must be a dictionary)",
-                )
-
-            tasks_by_id[task["id"]] = task
-
-            if task["tool_name"] not in self.tool_manager.tools:
-                return (
-                    False,
-                    f"Task '{task['id']}' references unknown tool '{task['tool_name']}'",
-                )
-
-        for task in plan["tasks"]:
-            if "depends_on" in task:
-                if not isinstance(task["depends_on"], list):
-                    return (
-                        False,
-                        f"Task '{task['id']}' has invalid 'depends_on' (must be a list)",
-                    )
-
-                for dep_id in task["depends_on"]:
-                    if dep_id not in tasks_by_id:
-                        return (
-                            False,
-                            f"Task '{task['id']}' depends on unknown task '{dep_id}'",
-                        )
-
-        for task in plan["tasks"]:
-            if "condition" in task:
-                if not isinstance(task["condition"], dict):
-                    return (
-                        False,
-                        f"Task '{task['id']}' has invalid 'condition' (must be a dictionary)",
-                    )
-
-                if "type" not in task["condition"]:
-                    return False, f"Task '{task['id']}' condition missing 'type' field"
-
-                if task["condition"]["type"] not in ["task_result", "expression"]:
-                    return (
-                        False,
-                        f"Task '{task['id']}' has invalid condition type '{task['condition']['type']}'",
-                    )
-
-                if task["condition"]["type"] == "task_result":
-                    if "task_id" not in task["condition"]:
-                        return (
-                            False,
-                            f"Task '{task['id']}' condition missing 'task_id' field",
-                        )
-
-                    if task["condition"]["task_id"] not in tasks_by_id:
-                        return (
-                            False,
-                            f"Task '{task['id']}' condition references unknown task '{task['condition']['task_id']}'",
-                        )
-
-        for task in plan["tasks"]:
-            if "depends_on" in task:
-                for dep_id in task["depends_on"]:
-                    dep_task = tasks_by_id[dep_id]
-                    if (
-                        "depends_on" in dep_task
-                        and task["id"] in dep_task["depends_on"]
-                    ):
-                        return (
-                            False,
-                            f"Circular dependency detected between tasks '{task['id']}' and '{dep_id}'",
-                        )
-
-        return True, None
+        return check_plan(plan, self.tool_manager.tools)
 
     def validate_task(self, task: dict[str, Any]) -> tuple[bool, str | None]:
         """Validate a single task for structural correctness.
@@ -194,13 +301,33 @@ class TaskPlanner:
         Returns:
             Dict containing execution results for the entire plan
         """
-        self.execution_history = []
+        self._serialized_results.clear()
+        # Cached reads are only trusted within one run; files may have
+        # changed since the previous plan
+        self._clear_result_cache()
+        self._cache_results = bool(plan.get("cacheable", True))
+
+        intern_task_keys(plan.get("tasks"))
+
+        # Validation builds the lookups used below, so the plan is walked once
+        _, error, plan_index = index_plan(plan, self.tool_manager.tools)
+
+        # Longest remaining path from each task, estimated from past tool
+        # run times; the total is only shown once every tool has been timed
+        path_length: dict[str, float] = {}
+        estimated_duration = None
+        if plan_index is not None:
+            path_length, estimated_duration = critical_path(
+                plan_index,
+                self._estimate_task_durations(plan_index),
+            )
+            if not self._durations_known(plan):
+                estimated_duration = None
 
         if self.ui and plan is not self.interactive_plan:
-            self._display_plan_summary(plan)
+            self._display_plan_summary(plan, estimated_duration)
 
-        is_valid, error = self.validate_plan(plan)
-        if not is_valid:
+        if plan_index is None:
             return {
                 "success": False,
                 "error": f"Invalid plan: {error}",
@@ -210,6 +337,11 @@ class TaskPlanner:
                 "failed_tasks": [],
             }
 
+        # Validation has checked that history_limit is an integer
+        self.execution_history = deque(
+            maxlen=max(1, plan.get("history_limit", _DEFAULT_HISTORY_LIMIT)),
+        )
+
         permission_operations = self._collect_permission_operations(plan)
         operations_pre_approved = False
 
@@ -250,185 +382,191 @@ class TaskPlanner:
                     "failed_tasks": [],
                 }
 
-        start_time = time.time()
+        # Read the wall clock once; per-task timestamps are derived from the
+        # monotonic clock so they stay consistent if the system time jumps
+        self._start_wall_time = time.time()
+        self._start_perf_ns = start_ns = time.perf_counter_ns()
 
         try:
-            if self.verbose and self.ui:
-                self.ui.console.print(
-                    f"[dim cyan][Verbose] Starting execution of plan: {plan['name']}[/]",
-                )
+            self._verbose_print(
+                f"Starting execution of plan: {plan['name']}",
+                "dim cyan",
+            )
 
-            tasks_by_id = {task["id"]: task for task in plan["tasks"]}
+            tasks_by_id = plan_index.tasks_by_id
             results = {}
-            completed_tasks = []
-            failed_tasks = []
+            # Insertion-ordered dicts act as ordered sets: O(1) membership
+            # checks for dependencies while keeping completion order
+            completed_tasks: dict[str, None] = {}
+            failed_tasks: dict[str, None] = {}
+            # The reverse dependency index lets a failure mark every
+            # downstream task as blocked in one traversal
+            dependents = plan_index.dependents
+            blocked: set[str] = set()
 
             if self.ui:
-                from rich.table import Table
-
-                progress_table = Table(
-                    title="Task Execution Plan",
-                    box=None,
-                    pad_edge=False,
-                )
-                progress_table.add_column("#", style="dim", width=3)
-                progress_table.add_column("Status", width=8)
-                progress_table.add_column("Task ID", style="cyan")
-                progress_table.add_column("Description", style="yellow")
-
-                for i, task in enumerate(plan["tasks"], 1):
-                    task_id = task.get("id", f"task{i}")
-                    description = task.get(
-                        "description",
-                        f"Execute {task.get('tool_name', 'unknown')}",
-                    )
-                    progress_table.add_row(
-                        str(i),
-                        "[dim]Pending[/]",
-                        task_id,
-                        description,
+                if self.verbose:
+                    self.ui.console.print(
+                        self._render_progress_table(self._progress_rows(plan), {}),
                     )
-
-                self.ui.console.print(progress_table)
-                self.ui.console.print("")
-
-            for task in plan["tasks"]:
-                task_id = task["id"]
-
-                if "depends_on" in task:
-                    dependencies_met = True
-                    for dep_id in task["depends_on"]:
-                        if dep_id not in completed_tasks or dep_id in failed_tasks:
-                            dependencies_met = False
-                            break
-
-                    if not dependencies_met:
-                        if self.verbose and self.ui:
-                            self.ui.console.print(
-                                f"[dim yellow][Verbose] Skipping task '{task_id}' due to unmet dependencies[/]",
+                    self.ui.console.print("")
+                else:
+                    # Outside verbose mode the table is updated in place
+                    # instead of printing several lines per task
+                    self._start_progress(plan)
+
+            max_parallel = max(1, plan.get("max_parallel", 1))
+            batch_id = plan.get("batch_id", "default_batch")
+            stop_on_failure = plan.get("stop_on_failure", False)
+            stop_execution = False
+
+            # Kahn's algorithm over a heap: a task is ready once its
+            # dependencies and the tasks whose results it reads have finished.
+            # Sequential plans start ready tasks in plan order; parallel plans
+            # start the task with the longest remaining path first, so the
+            # critical path is never left waiting
+            task_order = plan_index.task_order
+            sort_keys = {
+                task_id: (-path_length[task_id] if max_parallel > 1 else 0.0, order)
+                for task_id, order in task_order.items()
+            }
+            remaining = dict(plan_index.dep_count)
+            ready = [
+                (sort_keys[task_id], task_id)
+                for task_id, count in remaining.items()
+                if count == 0
+            ]
+            heapq.heapify(ready)
+            inflight: dict[Future, tuple[dict[str, Any], dict[str, Any], str]] = {}
+            # Worker threads only report finished futures here; all scheduling
+            # state is updated on this thread, so it needs no locking
+            completions: queue.SimpleQueue[Future] = queue.SimpleQueue()
+
+            with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+                # After stop_on_failure triggers, tasks already running are
+                # still recorded but nothing new is started
+                while inflight or (ready and not stop_execution):
+                    while ready and not stop_execution and len(inflight) < max_parallel:
+                        _, task_id = heapq.heappop(ready)
+                        task = tasks_by_id[task_id]
+
+                        if self._skip_task(
+                            task,
+                            results,
+                            completed_tasks,
+                            failed_tasks,
+                            blocked,
+                        ):
+                            release_dependents(
+                                task_id,
+                                plan_index,
+                                remaining,
+                                ready,
+                                sort_keys,
                             )
-                        failed_tasks.append(task_id)
-                        results[task_id] = {
-                            "success": False,
-                            "error": "Dependencies not met",
-                            "skipped": True,
-                        }
-                        continue
+                            continue
 
-                if "condition" in task:
-                    condition = task["condition"]
-                    condition_met = self._evaluate_condition(condition, results)
+                        arguments = self._prepare_task_arguments(
+                            task,
+                            results,
+                            len(completed_tasks) + len(inflight) + 1,
+                            len(plan["tasks"]),
+                        )
+                        # Serialized once for both the result cache key and
+                        # the history entry
+                        arguments_json = json.dumps(
+                            arguments,
+                            sort_keys=True,
+                            default=str,
+                        )
+                        logger.info(
+                            f"Executing task '{task_id}' with tool '{task['tool_name']}' using batch_id: {batch_id}",
+                        )
 
-                    if not condition_met:
-                        if self.verbose and self.ui:
-                            self.ui.console.print(
-                                f"[dim yellow][Verbose] Skipping task '{task_id}' as condition not met[/]",
+                        if max_parallel > 1:
+                            future = executor.submit(
+                                self._run_task,
+                                task,
+                                arguments,
+                                arguments_json,
+                                client_type,
+                                operations_pre_approved,
                             )
-                        results[task_id] = {
-                            "success": True,
-                            "skipped": True,
-                            "reason": "Condition not met",
-                        }
-                        completed_tasks.append(task_id)
-                        continue
-
-                if self.ui:
-                    task_desc = task.get("description", f"Execute {task['tool_name']}")
-                    self.ui.print_content(
-                        f"[cyan]⏳ Task {len(completed_tasks) + 1}/{len(plan['tasks'])}: {task_desc}[/]",
-                        style="cyan",
-                    )
-
-                if self.verbose and self.ui:
-                    self.ui.console.print(
-                        f"[dim cyan][Verbose] Executing task '{task_id}' with tool '{task['tool_name']}'[/]",
-                    )
+                            inflight[future] = (task, arguments, arguments_json)
+                            future.add_done_callback(completions.put)
+                            continue
+
+                        # Sequential plans run inline so that stop_on_failure
+                        # halts before the next task starts
+                        raw_result = self._run_task(
+                            task,
+                            arguments,
+                            arguments_json,
+                            client_type,
+                            operations_pre_approved,
+                        )
+                        succeeded = self._record_task_result(
+                            task,
+                            arguments,
+                            arguments_json,
+                            raw_result,
+                            results,
+                            completed_tasks,
+                            failed_tasks,
+                        )
+                        if task_id in failed_tasks:
+                            block_dependents(task_id, dependents, blocked)
+                        release_dependents(
+                            task_id,
+                            plan_index,
+                            remaining,
+                            ready,
+                            sort_keys,
+                        )
+                        if not succeeded and stop_on_failure:
+                            stop_execution = True
 
-                tool_name = task["tool_name"]
-                arguments = task.get("arguments", {})
+                    if not inflight:
+                        continue
 
-                if "template_vars" in task:
-                    arguments = self._process_template_vars(
+                    future = completions.get()
+                    task, arguments, arguments_json = inflight.pop(future)
+                    task_id = task["id"]
+                    succeeded = self._record_task_result(
+                        task,
                         arguments,
-                        task["template_vars"],
+                        arguments_json,
+                        future.result(),
                         results,
+                        completed_tasks,
+                        failed_tasks,
                     )
-
-                if self.ui:
-                    self.ui.print_tool_call(tool_name, arguments)
-
-                batch_id = plan.get("batch_id", "default_batch")
-                logger.info(
-                    f"Executing task '{task_id}' with tool '{tool_name}' using batch_id: {batch_id}",
-                )
-                try:
-                    raw_result = self.tool_manager.execute_tool(
-                        tool_name,
-                        arguments,
-                        True,
-                        client_type,
-                        operations_pre_approved,
+                    if task_id in failed_tasks:
+                        block_dependents(task_id, dependents, blocked)
+                    release_dependents(
+                        task_id,
+                        plan_index,
+                        remaining,
+                        ready,
+                        sort_keys,
                     )
-                except PermissionDeniedError:
-                    failed_tasks.append(task_id)
-                    results[task_id] = {
-                        "success": False,
-                        "error": "Permission denied",
-                        "skipped": True,
-                    }
-                    continue
-
-                results[task_id] = raw_result
-
-                history_entry = {
-                    "task_id": task_id,
-                    "tool_name": tool_name,
-                    "arguments": arguments,
-                    "success": raw_result.get("success", False),
-                    "timestamp": time.time(),
-                }
-                self.execution_history.append(history_entry)
-
-                if raw_result.get("success", False):
-                    completed_tasks.append(task_id)
-                    if self.ui:
-                        self.ui.print_content(
-                            f"[green]✓ Task '{task_id}' completed successfully[/]",
-                            style=None,
-                        )
-                else:
-                    failed_tasks.append(task_id)
-                    error_msg = raw_result.get("error", "Unknown error")
-
-                    tool_name = task.get("tool_name", "unknown")
-                    task_desc = task.get("description", f"Execute {tool_name}")
+                    if not succeeded and stop_on_failure:
+                        stop_execution = True
 
-                    if self.ui:
-                        self.ui.print_content(
-                            f"[red]✗ Task '{task_id}' failed: {error_msg}[/]",
-                        )
+            self._stop_progress()
 
-                        display_error(
-                            self.ui,
-                            error_msg,
-                            tool_name,
-                            arguments,
-                            task_id,
-                            task_desc,
-                        )
-
-                    if plan.get("stop_on_failure", False):
-                        if self.ui:
-                            self.ui.print_content(
-                                "[yellow]⚠ Stopping plan execution due to task failure (stop_on_failure=True)[/]",
-                            )
-                        if self.verbose and self.ui:
-                            self.ui.console.print(
-                                f"[dim red][Verbose] Task '{task_id}' failed and stop_on_failure is set. Stopping plan execution.[/]",
-                            )
-                        break
+            if stop_execution:
+                if self.ui:
+                    self.ui.print_content(
+                        "[yellow]⚠ Stopping plan execution due to task failure (stop_on_failure=True)[/]",
+                        markup=True,
+                    )
+                self._verbose_print(
+                    "A task failed and stop_on_failure is set. Stopping plan execution.",
+                    "dim red",
+                )
 
-            execution_time = time.time() - start_time
+            execution_time = (time.perf_counter_ns() - start_ns) / 1e9
 
             if self.ui:
                 if len(failed_tasks) == 0:
@@ -450,6 +588,7 @@ class TaskPlanner:
                 self.ui.print_content(
                     f"[{color}]{icon} {status} completed plan '{plan['name']}' in {execution_time:.2f}s. "
                     f"Completed {len(completed_tasks)}/{len(plan['tasks'])} tasks.[/]",
+                    markup=True,
                 )
 
                 if recovery_needed and failed_tasks:
@@ -473,13 +612,14 @@ class TaskPlanner:
                             f"[yellow bold]Error Summary:[/]\n{failed_summary}\n\n"
                             f"[blue bold]Next Steps:[/] The LLM should analyze these errors and attempt recovery "
                             f"by modifying the approach or creating a new plan.",
+                            markup=True,
                         )
 
-            if self.verbose and self.ui:
-                self.ui.console.print(
-                    f"[dim green][Verbose] Plan execution completed in {execution_time:.2f}s. "
-                    f"Completed: {len(completed_tasks)}/{len(plan['tasks'])} tasks.[/]",
-                )
+            self._verbose_print(
+                f"Plan execution completed in {execution_time:.2f}s. "
+                f"Completed: {len(completed_tasks)}/{len(plan['tasks'])} tasks.",
+                "dim green",
+            )
 
             return {
                 "success": len(failed_tasks) == 0,
@@ -491,17 +631,17 @@ class TaskPlanner:
                 "plan_name": plan["name"],
                 "description": plan.get("description", ""),
                 "results": results,
-                "completed_tasks": completed_tasks,
-                "failed_tasks": failed_tasks,
+                "completed_tasks": list(completed_tasks),
+                "failed_tasks": list(failed_tasks),
                 "execution_time": execution_time,
             }
 
         except Exception as e:
             logger.exception(f"Error executing plan: {e}")
-            if self.verbose and self.ui:
-                self.ui.console.print(
-                    f"[dim red][Verbose] Error executing plan: {str(e)}[/]",
-                )
+            self._verbose_print(
+                f"Error executing plan: {str(e)}",
+                "dim red",
+            )
 
             return {
                 "success": False,
@@ -509,14 +649,449 @@ class TaskPlanner:
                 "plan_name": plan.get("name", "unknown"),
                 "results": results if "results" in locals() else {},
                 "completed_tasks": (
-                    completed_tasks if "completed_tasks" in locals() else []
+                    list(completed_tasks) if "completed_tasks" in locals() else []
+                ),
+                "failed_tasks": (
+                    list(failed_tasks) if "failed_tasks" in locals() else []
                 ),
-                "failed_tasks": failed_tasks if "failed_tasks" in locals() else [],
             }
         finally:
+            self._stop_progress()
             if operations_pre_approved:
                 self.tool_manager.trust_manager.clear_approved_operations()
 
+    def _progress_rows(self, plan: dict[str, Any]) -> list[tuple[str, str, str]]:
+        """Collect the static columns of the task progress table.
+
+        Args:
+            plan: The task plan being executed
+
+        Returns:
+            List of (row number, task ID, description) tuples in plan order
+        """
+        rows = []
+        for i, task in enumerate(plan["tasks"], 1):
+            description = task.get(
+                "description",
+                f"Execute {task.get('tool_name', 'unknown')}",
+            )
+            rows.append((str(i), task.get("id", f"task{i}"), description))
+        return rows
+
+    def _render_progress_table(
+        self,
+        rows: list[tuple[str, str, str]],
+        statuses: dict[str, str],
+    ) -> Any:
+        """Build the task progress table.
+
+        Args:
+            rows: Static row data from _progress_rows
+            statuses: Rich markup for the status of each task that has one
+
+        Returns:
+            A Rich Table with one row per task
+        """
+        from rich.table import Table
+
+        progress_table = Table(
+            title="Task Execution Plan",
+            box=None,
+            pad_edge=False,
+        )
+        progress_table.add_column("#", style="dim", width=3)
+        progress_table.add_column("Status", width=8)
+        progress_table.add_column("Task ID", style="cyan")
+        progress_table.add_column("Description", style="yellow")
+
+        for number, task_id, description in rows:
+            progress_table.add_row(
+                number,
+                statuses.get(task_id, "[dim]Pending[/]"),
+                task_id,
+                description,
+            )
+
+        return progress_table
+
+    def _start_progress(self, plan: dict[str, Any]) -> None:
+        """Show the progress table as a live display.
+
+        Any live display the UI already shows (e.g. the interactive plan
+        panel) is stopped first, since Rich allows only one at a time. Output
+        that is not a terminal gets no live display, so each task prints its
+        own lines instead.
+
+        Args:
+            plan: The task plan being executed
+        """
+        if not self.ui.console.is_terminal:
+            return
+
+        from rich.live import Live
+
+        if getattr(self.ui, "active_live_display", None):
+            self.ui.active_live_display.stop()
+            self.ui.active_live_display = None
+
+        rows = self._progress_rows(plan)
+        live = Live(
+            self._render_progress_table(rows, {}),
+            console=self.ui.console,
+            refresh_per_second=8,
+        )
+        live.start()
+        self.ui.active_live_display = live
+        self._progress = (live, rows, {})
+
+    def _set_progress(self, task_id: str, status: str) -> bool:
+        """Update a task's status in the live progress table.
+
+        Args:
+            task_id: ID of the task
+            status: Rich markup for the new status
+
+        Returns:
+            Whether a live table is shown; if not, callers print a line instead
+        """
+        if self._progress is None:
+            return False
+
+        live, rows, statuses = self._progress
+        statuses[task_id] = status
+        live.update(self._render_progress_table(rows, statuses))
+        return True
+
+    def _stop_progress(self) -> None:
+        """Stop the live progress table, leaving its final state on screen."""
+        if self._progress is not None:
+            live = self._progress[0]
+            live.stop()
+            if self.ui.active_live_display is live:
+                self.ui.active_live_display = None
+            self._progress = None
+
+    def _skip_task(
+        self,
+        task: dict[str, Any],
+        results: dict[str, Any],
+        completed_tasks: dict[str, None],
+        failed_tasks: dict[str, None],
+        blocked: set[str],
+    ) -> bool:
+        """Record a skip result for a task that should not run.
+
+        A task is skipped as failed when a task it depends on failed, and as
+        completed when its condition is not met.
+
+        Args:
+            task: The task about to be dispatched
+            results: Results of tasks run so far, updated in place
+            completed_tasks: Ordered set of completed task IDs, updated in place
+            failed_tasks: Ordered set of failed task IDs, updated in place
+            blocked: IDs of tasks downstream of a failed task
+
+        Returns:
+            Whether the task was skipped
+        """
+        task_id = task["id"]
+
+        if task_id in blocked:
+            self._verbose_print(
+                f"Skipping task '{task_id}' due to unmet dependencies",
+                "dim yellow",
+            )
+            self._set_progress(task_id, "[dim]Skipped[/]")
+            failed_tasks[task_id] = None
+            results[task_id] = {
+                "success": False,
+                "error": "Dependencies not met",
+                "skipped": True,
+            }
+            return True
+
+        if "condition" in task and not self._evaluate_condition(
+            task["condition"],
+            results,
+        ):
+            self._verbose_print(
+                f"Skipping task '{task_id}' as condition not met",
+                "dim yellow",
+            )
+            self._set_progress(task_id, "[dim]Skipped[/]")
+            results[task_id] = {
+                "success": True,
+                "skipped": True,
+                "reason": "Condition not met",
+            }
+            completed_tasks[task_id] = None
+            return True
+
+        return False
+
+    def _prepare_task_arguments(
+        self,
+        task: dict[str, Any],
+        results: dict[str, Any],
+        task_number: int,
+        task_count: int,
+    ) -> dict[str, Any]:
+        """Announce a task and resolve its arguments.
+
+        Args:
+            task: The task about to run
+            results: Results of previous task executions
+            task_number: Position of the task in the execution sequence
+            task_count: Total number of tasks in the plan
+
+        Returns:
+            The task arguments with template variables processed
+        """
+        task_id = task["id"]
+        tool_name = task["tool_name"]
+
+        show_lines = self.ui and not self._set_progress(task_id, "[cyan]Running[/]")
+        if show_lines:
+            task_desc = task.get("description", f"Execute {tool_name}")
+            self.ui.print_content(
+                f"[cyan]⏳ Task {task_number}/{task_count}: {task_desc}[/]",
+                style="cyan",
+            )
+
+        self._verbose_print(
+            f"Executing task '{task_id}' with tool '{tool_name}'",
+            "dim cyan",
+        )
+
+        arguments = task.get("arguments", {})
+
+        if "template_vars" in task:
+            arguments = self._process_template_vars(
+                arguments,
+                task["template_vars"],
+                results,
+            )
+
+        if show_lines:
+            self.ui.print_tool_call(tool_name, arguments)
+
+        return arguments
+
+    def _run_task(
+        self,
+        task: dict[str, Any],
+        arguments: dict[str, Any],
+        arguments_json: str,
+        client_type: str | None,
+        pre_approved: bool,
+    ) -> dict[str, Any] | None:
+        """Execute a single task's tool call.
+
+        Safe to call from worker threads: it does not touch the UI or any
+        shared execution state, and its timing and result caches are locked.
+        Pure tools with arguments seen earlier in the run reuse that result.
+
+        Args:
+            task: The task to execute
+            arguments: The resolved task arguments
+            arguments_json: Canonical JSON of the arguments
+            client_type: The client type to use for result formatting
+            pre_approved: Whether the plan's operations were pre-approved
+
+        Returns:
+            The tool result, or None if permission was denied
+        """
+        tool_name = task["tool_name"]
+        cache_key = None
+        if self._cache_results and self._is_pure_tool(tool_name):
+            cache_key = (tool_name, arguments_json)
+            with self._result_cache_lock:
+                cached = self._result_cache.get(cache_key)
+                if cached is not None:
+                    self._result_cache.move_to_end(cache_key)
+                    return dict(cached)
+                generation = self._result_cache_generation
+        else:
+            # Anything else may change what a cached read would return
+            self._clear_result_cache()
+
+        started = time.perf_counter()
+        try:
+            result = self.tool_manager.execute_tool(
+                tool_name,
+                arguments,
+                True,
+                client_type,
+                pre_approved,
+            )
+        except PermissionDeniedError:
+            return None
+
+        self._record_tool_duration(tool_name, time.perf_counter() - started)
+
+        if cache_key is None:
+            self._clear_result_cache()
+        elif result.get("success", False):
+            with self._result_cache_lock:
+                # Skip storing if another task may have changed state while
+                # this one was reading
+                if generation == self._result_cache_generation:
+                    self._result_cache[cache_key] = dict(result)
+                    if len(self._result_cache) > _RESULT_CACHE_SIZE:
+                        self._result_cache.popitem(last=False)
+
+        return result
+
+    def _is_pure_tool(self, tool_name: str) -> bool:
+        """Check whether a tool only reads state, so its results can be reused.
+
+        Args:
+            tool_name: Name of the tool
+
+        Returns:
+            Whether the tool declares is_pure
+        """
+        tool = self.tool_manager.tools.get(tool_name)
+        return getattr(tool, "is_pure", False) is True
+
+    def _clear_result_cache(self) -> None:
+        """Forget cached pure tool results."""
+        with self._result_cache_lock:
+            self._result_cache.clear()
+            self._result_cache_generation += 1
+
+    def _record_tool_duration(self, tool_name: str, duration: float) -> None:
+        """Fold a measured run time into the tool's moving-average duration.
+
+        Args:
+            tool_name: Name of the tool that ran
+            duration: How long the tool call took, in seconds
+        """
+        with self._tool_durations_lock:
+            previous = self._tool_durations.get(tool_name)
+            self._tool_durations[tool_name] = (
+                duration
+                if previous is None
+                else previous + _DURATION_SMOOTHING * (duration - previous)
+            )
+
+    def _estimate_task_durations(self, plan_index: PlanIndex) -> dict[str, float]:
+        """Estimate each task's duration from its tool's past run times.
+
+        Args:
+            plan_index: Lookups built while validating the plan
+
+        Returns:
+            Expected duration in seconds per task ID
+        """
+        durations = self._tool_durations
+        return {
+            task_id: durations.get(task["tool_name"], _DEFAULT_TASK_DURATION)
+            for task_id, task in plan_index.tasks_by_id.items()
+        }
+
+    def _durations_known(self, plan: dict[str, Any]) -> bool:
+        """Check whether every tool in the plan has been timed before.
+
+        Args:
+            plan: The task plan
+
+        Returns:
+            Whether an estimated duration would be based on real timings
+        """
+        return all(
+            task.get("tool_name") in self._tool_durations
+            for task in plan.get("tasks", [])
+        )
+
+    def _record_task_result(
+        self,
+        task: dict[str, Any],
+        arguments: dict[str, Any],
+        arguments_json: str,
+        raw_result: dict[str, Any] | None,
+        results: dict[str, Any],
+        completed_tasks: dict[str, None],
+        failed_tasks: dict[str, None],
+    ) -> bool:
+        """Record the outcome of an executed task and report it.
+
+        Args:
+            task: The executed task
+            arguments: The arguments the task ran with
+            arguments_json: Canonical JSON of the arguments
+            raw_result: The tool result, or None if permission was denied
+            results: Results of task executions, updated in place
+            completed_tasks: Ordered set of completed task IDs, updated in place
+            failed_tasks: Ordered set of failed task IDs, updated in place
+
+        Returns:
+            Whether the task succeeded. Permission denials count as success
+            here so that they do not trigger stop_on_failure.
+        """
+        task_id = task["id"]
+
+        if raw_result is None:
+            self._set_progress(task_id, "[red]Denied[/]")
+            failed_tasks[task_id] = None
+            results[task_id] = {
+                "success": False,
+                "error": "Permission denied",
+                "skipped": True,
+            }
+            return True
+
+        results[task_id] = raw_result
+
+        tool_name = task["tool_name"]
+        elapsed = (time.perf_counter_ns() - self._start_perf_ns) / 1e9
+        history_entry = {
+            "task_id": task_id,
+            "tool_name": tool_name,
+            "success": raw_result.get("success", False),
+            "timestamp": self._start_wall_time + elapsed,
+        }
+        # Keeping full arguments would retain file contents and other large
+        # values for the life of the history, so only do it in verbose mode.
+        # The JSON string is kept rather than the live (mutable) dict.
+        if self.verbose:
+            history_entry["arguments"] = arguments_json
+        else:
+            history_entry["argument_size"] = len(arguments_json)
+        self.execution_history.append(history_entry)
+
+        if raw_result.get("success", False):
+            completed_tasks[task_id] = None
+            if self.ui and not self._set_progress(task_id, "[green]Done[/]"):
+                self.ui.print_content(
+                    f"[green]✓ Task '{task_id}' completed successfully[/]",
+                    style=None,
+                    markup=True,
+                )
+            return True
+
+        failed_tasks[task_id] = None
+        error_msg = raw_result.get("error", "Unknown error")
+        task_desc = task.get("description", f"Execute {tool_name}")
+
+        if self.ui:
+            if not self._set_progress(task_id, "[red]Failed[/]"):
+                self.ui.print_content(
+                    f"[red]✗ Task '{task_id}' failed: {error_msg}[/]",
+                    markup=True,
+                )
+
+            display_error(
+                self.ui,
+                error_msg,
+                tool_name,
+                arguments,
+                task_id,
+                task_desc,
+            )
+
+        return False
+
     def start_interactive_plan(self, name: str, description: str) -> dict[str, Any]:
         """Start an interactive planning session.
 
@@ -675,28 +1250,7 @@ class TaskPlanner:
         Returns:
             Whether the condition is met
         """
-        condition_type = condition["type"]
-
-        if condition_type == "task_result":
-            task_id = condition["task_id"]
-            if task_id not in results:
-                return False
-
-            task_result = results[task_id]
-            field = condition.get("field", "success")
-            expected_value = condition.get("value", True)
-
-            actual_value = task_result.get(field)
-
-            if condition.get("operator") == "not_equals":
-                return actual_value != expected_value
-            else:
-                return actual_value == expected_value
-
-        elif condition_type == "expression":
-            return True
-
-        return False
+        return evaluate_condition(condition, results)
 
     def _process_template_vars(
         self,
@@ -706,108 +1260,97 @@ class TaskPlanner:
     ) -> dict[str, Any]:
         """Process template variables in task arguments.
 
+        Each variable is resolved the first time a placeholder uses it, and
+        strings in nested dicts and lists then share that value.
+
         Args:
             arguments: The original arguments dictionary
             template_vars: Template variable definitions
             results: Results from previous task executions
 
         Returns:
-            Updated arguments with template variables processed
+            Updated arguments with template variables processed, or the
+            original arguments if they contain no placeholders
         """
-        processed_args = {}
-
-        for key, value in arguments.items():
-            if isinstance(value, str):
-                processed_value = value
-                for var_name, var_def in template_vars.items():
-                    placeholder = f"${{{var_name}}}"
-                    if placeholder in processed_value:
-                        if var_def.get("type") == "task_result":
-                            task_id = var_def["task_id"]
-                            if task_id in results:
-                                result_value = results[task_id]
-
-                                if "field" in var_def:
-                                    field_path = var_def["field"].split(".")
-                                    field_value = result_value
-
-                                    for field in field_path:
-                                        if (
-                                            isinstance(field_value, dict)
-                                            and field in field_value
-                                        ):
-                                            field_value = field_value[field]
-                                        else:
-                                            field_value = var_def.get("default", "")
-                                            break
-
-                                    replacement_value = str(field_value).replace(
-                                        "\n",
-                                        "",
-                                    )
-                                else:
-                                    if isinstance(result_value, dict):
-                                        replacement_value = json.dumps(result_value)
-                                    else:
-                                        replacement_value = str(result_value)
-
-                                processed_value = processed_value.replace(
-                                    placeholder,
-                                    replacement_value,
-                                )
-                            else:
-                                default_value = var_def.get("default", "")
-                                processed_value = processed_value.replace(
-                                    placeholder,
-                                    str(default_value),
-                                )
-                        elif var_def.get("type") == "static":
-                            static_value = var_def.get("value", "")
-                            processed_value = processed_value.replace(
-                                placeholder,
-                                str(static_value),
-                            )
+        if not template_vars or not has_placeholder(arguments):
+            return arguments
+
+        resolved = ResolvedVars(
+            lambda name: (
+                self._resolve_template_var(template_vars[name], results)
+                if name in template_vars
+                else None
+            ),
+        )
+        return substitute_template_vars(arguments, resolved)
+
+    def _resolve_template_var(
+        self,
+        var_def: dict[str, Any],
+        results: dict[str, Any],
+    ) -> str | None:
+        """Resolve the replacement text for a template variable.
+
+        Args:
+            var_def: The template variable definition
+            results: Results from previous task executions
+
+        Returns:
+            The replacement text, or None if the variable type is not supported
+        """
+        if var_def.get("type") == "task_result":
+            task_id = var_def["task_id"]
+            if task_id not in results:
+                return str(var_def.get("default", ""))
 
-                processed_args[key] = processed_value
-            elif isinstance(value, dict):
-                processed_args[key] = self._process_template_vars(
-                    value,
-                    template_vars,
-                    results,
+            result_value = results[task_id]
+
+            if "field" in var_def:
+                field_value = lookup_field(
+                    result_value,
+                    var_def["field"],
+                    var_def.get("default", ""),
                 )
-            elif isinstance(value, list):
-                processed_list = []
-                for item in value:
-                    if isinstance(item, str):
-                        processed_item = item
-                        for var_name, var_def in template_vars.items():
-                            placeholder = f"${{{var_name}}}"
-                            if placeholder in processed_item:
-                                replacement = str(
-                                    var_def.get("value", var_def.get("default", "")),
-                                )
-                                processed_item = processed_item.replace(
-                                    placeholder,
-                                    replacement,
-                                )
-                        processed_list.append(processed_item)
-                    elif isinstance(item, dict):
-                        processed_list.append(
-                            self._process_template_vars(item, template_vars, results),
-                        )
-                    else:
-                        processed_list.append(item)
-                processed_args[key] = processed_list
-            else:
-                processed_args[key] = value
+                return str(field_value).replace("\n", "")
+
+            if isinstance(result_value, dict):
+                return self._serialize_result(task_id, result_value)
+            return str(result_value)
+
+        if var_def.get("type") == "static":
+            return str(var_def["value"])
+
+        return None
+
+    def _serialize_result(self, task_id: str, result: dict[str, Any]) -> str:
+        """Return a task result as JSON, encoding each result only once.
+
+        Args:
+            task_id: ID of the task that produced the result
+            result: The task result
+
+        Returns:
+            The JSON-encoded result
+        """
+        cached = self._serialized_results.get(task_id)
+        if cached is not None and cached[0] is result:
+            return cached[1]
 
-        return processed_args
+        serialized = json.dumps(result)
+        self._serialized_results[task_id] = (result, serialized)
+        return serialized
 
-    def _display_plan_summary(self, plan: dict[str, Any]) -> None:
+    def _display_plan_summary(
+        self,
+        plan: dict[str, Any],
+        estimated_duration: float | None = None,
+    ) -> None:
         """Display a summary of the plan to the user.
 
         Args:
             plan: The task plan to display
+            estimated_duration: Expected plan run time along its critical
+                path, in seconds, if known
         """
         from rich.panel import Panel
         from rich.table import Table
@@ -864,6 +1407,11 @@ class TaskPlanner:
         panel_content.append(Text(str(len(plan.get("tasks", [])))))
         panel_content.append(Text("\n"))
 
+        if estimated_duration is not None:
+            panel_content.append(Text("Estimated Duration: ", style="bold"))
+            panel_content.append(Text(f"~{estimated_duration:.1f}s"))
+            panel_content.append(Text("\n"))
+
         panel_content.append(Text("Stop on Failure: ", style="bold"))
         panel_content.append(
             Text("Yes" if plan.get("stop_on_failure", False) else "No"),
@@ -895,6 +1443,10 @@ class TaskPlanner:
     ) -> list[tuple[str, Any, str]]:
         """Collect all operations in the plan that require permission.
 
+        Operations repeated across tasks (same tool and path, or the same bash
+        command) are listed once. Paths are found the way the tool manager
+        finds them when checking a task's permission.
+
         Args:
             plan: The task plan to analyze
 
@@ -902,36 +1454,38 @@ class TaskPlanner:
             List of (tool_name, path, description) tuples for operations requiring permission
         """
         permission_operations = []
+        seen_operations: set[tuple[str, Any]] = set()
 
-        tools_requiring_permission = {}
-        for tool_name, tool in self.tool_manager.tools.items():
-            if tool.requires_confirmation:
-                tools_requiring_permission[tool_name] = tool
-
+        confirming_tool_names = self.tool_manager.confirming_tool_names
         for task in plan.get("tasks", []):
             tool_name = task.get("tool_name")
 
-            if tool_name in tools_requiring_permission:
+            if tool_name in confirming_tool_names:
                 arguments = task.get("arguments", {})
+                # Use the same path the tool manager checks when the task runs,
+                # so pre-approval covers exactly what it would prompt for
+                permission_path = self.tool_manager._get_permission_path(
+                    tool_name,
+                    arguments,
+                )
 
-                if tool_name == "bash" and "command" in arguments:
-                    permission_path = arguments
+                if isinstance(permission_path, dict):
+                    operation_key = (tool_name, str(permission_path["command"]))
                     task_desc = task.get(
                         "description",
-                        f"Execute command: {arguments.get('command')}",
+                        f"Execute command: {permission_path['command']}",
                     )
                 else:
-                    permission_path = None
-                    for arg_name, arg_value in arguments.items():
-                        if isinstance(arg_value, str) and arg_name in (
-                            "path",
-                            "file_path",
-                        ):
-                            permission_path = arg_value
-                            break
-
+                    operation_key = (tool_name, permission_path)
                     task_desc = task.get("description", f"Execute {tool_name}")
 
+                # Identical operations only need to be approved once; tasks
+                # without a path are each listed so none goes undescribed
+                if permission_path is not None:
+                    if operation_key in seen_operations:
+                        continue
+                    seen_operations.add(operation_key)
+
                 permission_operations.append((tool_name, permission_path, task_desc))
 
         return permission_operations
@@ -939,109 +1493,9 @@ class TaskPlanner:
     def get_plan_schema(self) -> dict[str, Any]:
         """Get the JSON schema for task plans.
 
+        The returned dictionary is shared between calls and must not be modified.
+
         Returns:
             JSON schema as a dictionary
         """
-        return {
-            "type": "object",
-            "required": ["name", "tasks"],
-            "properties": {
-                "name": {"type": "string", "description": "Name of the task plan"},
-                "description": {
-                    "type": "string",
-                    "description": "Description of what the plan does",
-                },
-                "stop_on_failure": {
-                    "type": "boolean",
-                    "description": "Whether to stop execution if a task fails",
-                    "default": False,
-                },
-                "tasks": {
-                    "type": "array",
-                    "description": "List of tasks to execute",
-                    "items": {
-                        "type": "object",
-                        "required": ["id", "tool_name"],
-                        "properties": {
-                            "id": {
-                                "type": "string",
-                                "description": "Unique identifier for the task",
-                            },
-                            "tool_name": {
-                                "type": "string",
-                                "description": "Name of the tool to execute",
-                            },
-                            "description": {
-                                "type": "string",
-                                "description": "Description of what the task does",
-                            },
-                            "arguments": {
-                                "type": "object",
-                                "description": "Arguments to pass to the tool",
-                            },
-                            "depends_on": {
-                                "type": "array",
-                                "description": "List of task IDs that must complete before this task",
-                                "items": {"type": "string"},
-                            },
-                            "condition": {
-                                "type": "object",
-                                "description": "Condition that determines if this task should run",
-                                "properties": {
-                                    "type": {
-                                        "type": "string",
-                                        "enum": ["task_result", "expression"],
-                                        "description": "Type of condition to evaluate",
-                                    },
-                                    "task_id": {
-                                        "type": "string",
-                                        "description": "ID of task whose result to check (for task_result type)",
-                                    },
-                                    "field": {
-                                        "type": "string",
-                                        "description": "Field in the task result to check (default: 'success')",
-                                    },
-                                    "operator": {
-                                        "type": "string",
-                                        "enum": ["equals", "not_equals"],
-                                        "default": "equals",
-                                        "description": "Comparison operator",
-                                    },
-                                    "value": {
-                                        "description": "Value to compare against",
-                                    },
-                                },
-                            },
-                            "template_vars": {
-                                "type": "object",
-                                "description": "Template variables for argument substitution",
-                                "additionalProperties": {
-                                    "type": "object",
-                                    "properties": {
-                                        "type": {
-                                            "type": "string",
-                                            "enum": ["task_result", "static"],
-                                            "description": "Source type for the variable",
-                                        },
-                                        "task_id": {
-                                            "type": "string",
-                                            "description": "ID of task whose result to use (for task_result type)",
-                                        },
-                                        "field": {
-                                            "type": "string",
-                                            "description": "Field path in the task result to use (dot notation)",
-                                        },
-                                        "value": {
-                                            "description": "Static value (for static type)",
-                                        },
-                                        "default": {
-                                            "description": "Default value to use if the source is unavailable",
-                                        },
-                                    },
-                                },
-                            },
-                        },
-                    },
-                },
-            },
-        }
+        return _PLAN_SCHEMA
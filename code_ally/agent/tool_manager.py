@@ -3,16 +3,105 @@
 Manages tool registration, validation, and execution.
 """
 
+import functools
+import hashlib
 import inspect
+import json
 import logging
-from typing import Any, Union
+import time
+from collections import deque
+from collections.abc import Callable
+from types import UnionType
+from typing import Any, Union, get_args, get_origin
 
 from code_ally.agent.permission_manager import PermissionManager
 from code_ally.tools.base import BaseTool
-from code_ally.trust import PermissionDeniedError, TrustManager
+from code_ally.trust import TrustManager
 
 logger = logging.getLogger(__name__)
 
+# Argument names that carry the path a tool operates on, in priority order
+_PERMISSION_PATH_KEYS = ("path", "file_path", "directory")
+
+# JSON Schema types for the Python annotations tools use
+_JSON_TYPES: dict[Any, str] = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    list: "array",
+}
+
+
+def _annotation_json_type(annotation: Any) -> str:
+    """Map a parameter annotation to a JSON Schema type.
+
+    Handles plain types, parameterized lists and Optional types (both
+    ``Optional[X]`` and ``X | None``). Anything else is a string.
+
+    Args:
+        annotation: The parameter annotation
+
+    Returns:
+        The JSON Schema type name
+    """
+    origin = get_origin(annotation)
+    if origin is Union or origin is UnionType:
+        args = get_args(annotation)
+        param_type = "string"
+        if type(None) in args:  # This is an Optional
+            for arg in args:
+                if arg is not type(None) and (get_origin(arg) or arg) in _JSON_TYPES:
+                    param_type = _annotation_json_type(arg)
+        return param_type
+
+    return _JSON_TYPES.get(origin or annotation, "string")
+
+
+@functools.cache
+def _parameters_schema(execute_method: Callable[..., Any]) -> dict[str, Any]:
+    """Build the JSON parameter schema for a tool's execute method.
+
+    Cached per tool class, so ToolManager instances share the result.
+
+    Args:
+        execute_method: The execute function of a tool class
+
+    Returns:
+        JSON schema describing the method's parameters
+    """
+    # Extract information from the method
+    sig = inspect.signature(execute_method)
+
+    # Build parameter schema
+    parameters = {"type": "object", "properties": {}, "required": []}
+
+    for param_name, param in sig.parameters.items():
+        if param_name == "self":
+            continue
+
+        # Default type is string
+        param_type = "string"
+
+        # Try to determine type from annotation
+        if param.annotation is not inspect.Parameter.empty:
+            param_type = _annotation_json_type(param.annotation)
+
+        # Set parameter description
+        param_desc = f"Parameter {param_name}"
+
+        # Add to properties
+        parameters["properties"][param_name] = {
+            "type": param_type,
+            "description": param_desc,
+        }
+
+        # If the parameter has no default value, it's required
+        if param.default is inspect.Parameter.empty:
+            parameters["required"].append(param_name)
+
+    return parameters
+
 
 class ToolManager:
     """Manages tool registration, validation, and execution."""
@@ -37,103 +126,54 @@ class ToolManager:
         self.ui = None  # Will be set by the Agent class
         self.client_type = None  # Will be set by the Agent when initialized
 
+        # Built on first use by get_function_definitions
+        self._function_defs_cache: list[dict[str, Any]] | None = None
+
         # Track recent tool calls to avoid redundancy
-        self.recent_tool_calls: list[tuple[str, tuple]] = []
         self.max_recent_calls = 5  # Remember last 5 calls
-        self.current_turn_tool_calls: list[tuple[str, tuple]] = (
-            []
-        )  # For the current conversation turn only
+        self.recent_tool_calls: deque[tuple[str, bytes]] = deque(
+            maxlen=self.max_recent_calls,
+        )
+        # For the current conversation turn only; a set for O(1) lookups
+        self.current_turn_tool_calls: set[tuple[str, bytes]] = set()
+
+    @functools.cached_property
+    def confirming_tool_names(self) -> frozenset[str]:
+        """Names of the registered tools that require user confirmation.
+
+        Tools are registered once at construction, so the set is computed on
+        first access and reused.
+        """
+        return frozenset(
+            name for name, tool in self.tools.items() if tool.requires_confirmation
+        )
 
     def get_function_definitions(self) -> list[dict[str, Any]]:
         """Create function definitions for tools in the format expected by the LLM.
 
+        Tools are fixed after construction, so the definitions are built once
+        and the same list is returned on later calls; it must not be modified.
+
         Returns:
             List of function definitions
         """
+        if self._function_defs_cache is not None:
+            return self._function_defs_cache
+
         function_defs = []
         for tool in self.tools.values():
-            # Get the execute method
-            execute_method = tool.execute
-
-            # Extract information from the method
-            sig = inspect.signature(execute_method)
-            # get docstring but not used here
-            _ = inspect.getdoc(execute_method) or ""
-
-            # Build parameter schema
-            parameters = {"type": "object", "properties": {}, "required": []}
-
-            for param_name, param in sig.parameters.items():
-                if param_name == "self":
-                    continue
-
-                # Default type is string
-                param_type = "string"
-
-                # Try to determine type from annotation
-                if param.annotation is not inspect.Parameter.empty:
-                    if param.annotation is str:
-                        param_type = "string"
-                    elif param.annotation is int:
-                        param_type = "integer"
-                    elif param.annotation is float:
-                        param_type = "number"
-                    elif param.annotation is bool:
-                        param_type = "boolean"
-                    elif (
-                        param.annotation is list
-                        or hasattr(param.annotation, "__origin__")
-                        and param.annotation.__origin__ is list
-                    ):
-                        param_type = "array"
-                    # Handle Optional/Union types
-                    elif (
-                        hasattr(param.annotation, "__origin__")
-                        and param.annotation.__origin__ is Union
-                    ):
-                        args = param.annotation.__args__
-                        if type(None) in args:  # This is an Optional
-                            for arg in args:
-                                if arg is not type(None):
-                                    if arg is str:
-                                        param_type = "string"
-                                    elif arg is int:
-                                        param_type = "integer"
-                                    elif arg is float:
-                                        param_type = "number"
-                                    elif arg is bool:
-                                        param_type = "boolean"
-                                    elif (
-                                        arg is list
-                                        or hasattr(arg, "__origin__")
-                                        and arg.__origin__ is list
-                                    ):
-                                        param_type = "array"
-
-                # Set parameter description
-                param_desc = f"Parameter {param_name}"
-
-                # Add to properties
-                parameters["properties"][param_name] = {
-                    "type": param_type,
-                    "description": param_desc,
-                }
-
-                # If the parameter has no default value, it's required
-                if param.default is inspect.Parameter.empty:
-                    parameters["required"].append(param_name)
-
             # Create the function definition
             function_def = {
                 "type": "function",
                 "function": {
                     "name": tool.name,
                     "description": tool.description,
-                    "parameters": parameters,
+                    "parameters": _parameters_schema(type(tool).execute),
                 },
             }
             function_defs.append(function_def)
 
+        self._function_defs_cache = function_defs
         return function_defs
 
     def execute_tool(
@@ -159,37 +199,53 @@ class ToolManager:
         Raises:
             PermissionDeniedError: If permission is denied for protected operations
         """
-        verbose_mode = self.ui and getattr(self.ui, "verbose", False)
+        # Looked up once and handed to the helpers below
+        verbose_mode = bool(self.ui) and getattr(self.ui, "verbose", False)
 
         if verbose_mode:
-            args_str = ", ".join(f"{k}={repr(v)}" for k, v in arguments.items())
+            # Arguments can hold whole file contents, so each value is
+            # abbreviated the same way tool call notifications are. The UI
+            # module is already loaded whenever a UI is attached.
+            from code_ally.agent.ui_manager import _short_argument
+
+            args_str = ", ".join(
+                f"{k}={_short_argument(v)}" for k, v in arguments.items()
+            )
             self.ui.console.print(
                 f"[dim magenta][Verbose] Starting tool execution: {tool_name}({args_str})[/]",
             )
 
         # Validate tool existence
-        if not self._is_valid_tool(tool_name):
+        if not self._is_valid_tool(tool_name, verbose_mode):
             return self._create_error_result(f"Unknown tool: {tool_name}")
 
-        # Check for redundancy
-        if self._is_redundant_call(tool_name, arguments):
-            return self._handle_redundant_call(tool_name, check_context_msg)
+        # Check for redundancy; the call key is built once for both steps
+        call_key = self._call_key(tool_name, arguments)
+        if self._is_redundant_call(call_key):
+            return self._handle_redundant_call(
+                tool_name,
+                check_context_msg,
+                verbose_mode,
+            )
 
         # Record this call
-        self._record_tool_call(tool_name, arguments)
+        self._record_tool_call(call_key)
 
         # Check permissions if not pre-approved
-        tool = self.tools[tool_name]
-        if tool.requires_confirmation and not pre_approved:
+        if not pre_approved and tool_name in self.confirming_tool_names:
             # Get permission path based on the tool and arguments
             permission_path = self._get_permission_path(tool_name, arguments)
 
-            try:
-                # Check if already trusted
+            # Tasks of a parallel plan reach this from worker threads; the
+            # lock keeps their prompts from interleaving, and an "always
+            # allow" answered while waiting is seen by the trust check
+            with self.trust_manager.lock:
+                # Already trusted operations go straight to execution
                 if not self.trust_manager.is_trusted(tool_name, permission_path):
-                    logger.info(f"Requesting permission for {tool_name}")
+                    logger.info("Requesting permission for %s", tool_name)
 
-                    # Prompt for permission (this may raise PermissionDeniedError)
+                    # Prompt for permission; a PermissionDeniedError
+                    # propagates to the caller
                     if not self.trust_manager.prompt_for_permission(
                         tool_name,
                         permission_path,
@@ -197,37 +253,53 @@ class ToolManager:
                         return self._create_error_result(
                             f"Permission denied for {tool_name}",
                         )
-            except PermissionDeniedError:
-                # Let exceptions propagate upward
-                raise
 
         # Execute the tool
-        return self._perform_tool_execution(tool_name, arguments)
+        return self._perform_tool_execution(tool_name, arguments, verbose_mode)
 
-    def _is_valid_tool(self, tool_name: str) -> bool:
+    def _is_valid_tool(self, tool_name: str, verbose_mode: bool = False) -> bool:
         """Check if a tool exists."""
         valid = tool_name in self.tools
 
-        if not valid and self.ui and getattr(self.ui, "verbose", False):
+        if not valid and verbose_mode:
             self.ui.console.print(f"[dim red][Verbose] Tool not found: {tool_name}[/]")
 
         return valid
 
-    def _is_redundant_call(self, tool_name: str, arguments: dict[str, Any]) -> bool:
+    def reset_turn(self) -> None:
+        """Forget the tool calls made in the current conversation turn."""
+        self.current_turn_tool_calls.clear()
+
+    @staticmethod
+    def _call_key(tool_name: str, arguments: dict[str, Any]) -> tuple[str, bytes]:
+        """Create a hashable representation of a tool call.
+
+        Arguments are serialized as canonical JSON, so calls with list or dict
+        arguments can be compared, and only a 16-byte digest of it is kept so
+        that large arguments such as file contents are not retained.
+        """
+        payload = json.dumps(arguments, sort_keys=True, default=str)
+        return (
+            tool_name,
+            hashlib.blake2b(
+                payload.encode("utf-8", "surrogatepass"),
+                digest_size=16,
+            ).digest(),
+        )
+
+    def _is_redundant_call(self, call_key: tuple[str, bytes]) -> bool:
         """Check if a tool call is redundant.
 
         Only considers calls made in the current conversation turn as redundant.
         """
-        # Create a hashable representation of the current call
-        current_call = (tool_name, tuple(sorted(arguments.items())))
-
         # Only check for redundancy within the current conversation turn
-        return current_call in self.current_turn_tool_calls
+        return call_key in self.current_turn_tool_calls
 
     def _handle_redundant_call(
         self,
         tool_name: str,
         check_context_msg: bool,
+        verbose_mode: bool = False,
     ) -> dict[str, Any]:
         """Handle a redundant tool call."""
         # Simple consistent message for redundancy
@@ -237,7 +309,7 @@ class ToolManager:
         if check_context_msg:
             error_msg += " Please check your context for the previous result."
 
-        if self.ui and getattr(self.ui, "verbose", False):
+        if verbose_mode:
             self.ui.console.print(
                 f"[dim yellow][Verbose] Redundant tool call detected: {tool_name}[/]",
             )
@@ -247,35 +319,26 @@ class ToolManager:
             "error": error_msg,
         }
 
-    def _record_tool_call(self, tool_name: str, arguments: dict[str, Any]) -> None:
+    def _record_tool_call(self, call_key: tuple[str, bytes]) -> None:
         """Record a tool call to avoid redundancy."""
-        current_call = (tool_name, tuple(sorted(arguments.items())))
-
-        # Add to both lists
-        self.recent_tool_calls.append(current_call)
-        self.current_turn_tool_calls.append(current_call)
-
-        # Keep only the most recent calls in the history
-        if len(self.recent_tool_calls) > self.max_recent_calls:
-            self.recent_tool_calls = self.recent_tool_calls[-self.max_recent_calls :]
+        # The deque drops the oldest call once max_recent_calls is reached
+        self.recent_tool_calls.append(call_key)
+        self.current_turn_tool_calls.add(call_key)
 
+    @staticmethod
     def _get_permission_path(
-        self,
         tool_name: str,
         arguments: dict[str, Any],
-    ) -> str | None:
+    ) -> str | dict[str, Any] | None:
         """Get the permission path for a tool."""
         # For bash tool, pass arguments.command as the path
         if tool_name == "bash" and "command" in arguments:
             return arguments
 
-        # Use the first string argument as the path, if any
-        for arg_name, arg_value in arguments.items():
-            if isinstance(arg_value, str) and arg_name in (
-                "path",
-                "file_path",
-                "directory",
-            ):
+        # Probe the known path arguments directly instead of scanning them all
+        for arg_name in _PERMISSION_PATH_KEYS:
+            arg_value = arguments.get(arg_name)
+            if isinstance(arg_value, str):
                 return arg_value
 
         return None
@@ -284,13 +347,11 @@ class ToolManager:
         self,
         tool_name: str,
         arguments: dict[str, Any],
+        verbose_mode: bool = False,
     ) -> dict[str, Any]:
         """Execute a tool with the given arguments."""
-        import time
-
         tool = self.tools[tool_name]
-        verbose_mode = self.ui and getattr(self.ui, "verbose", False)
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         try:
             if verbose_mode:
@@ -299,7 +360,7 @@ class ToolManager:
                 )
 
             result = tool.execute(**arguments)
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
 
             if verbose_mode:
                 self.ui.console.print(
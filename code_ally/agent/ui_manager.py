@@ -3,22 +3,155 @@
 Manages UI rendering and user interaction.
 """
 
+import functools
 import os
+import reprlib
 import threading
 import time
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from prompt_toolkit import PromptSession
-from prompt_toolkit.history import FileHistory
-from prompt_toolkit.key_binding import KeyBindings, KeyPressEvent
 from rich.console import Console
 from rich.live import Live
-from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.spinner import Spinner
 from rich.table import Table
 from rich.text import Text
 
+if TYPE_CHECKING:
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.key_binding import KeyPressEvent
+    from rich.console import ConsoleOptions, RenderResult
+    from rich.markdown import Markdown
+
+# DEC private mode 2026: the terminal holds back drawing until the end marker,
+# so a frame is never shown half written. Terminals without it ignore both.
+_SYNC_OUTPUT_BEGIN = "\x1b[?2026h"
+_SYNC_OUTPUT_END = "\x1b[?2026l"
+
+
+_HELP_TEXT = """
+# Code Ally Commands
+
+- `/help` - Show this help message
+- `/clear` - Clear the conversation history
+- `/config` - Show or update configuration settings
+- `/debug` - Toggle debug mode
+- `/dump` - Dump the conversation history to file
+- `/compact` - Compact the conversation to reduce context size
+- `/trust` - Show trust status for tools
+- `/verbose` - Toggle verbose mode (show model thinking)
+
+Type a message to chat with the AI assistant.
+Use up/down arrow keys to navigate through command history.
+"""
+
+
+# Where the prompt keeps its command history
+_HISTORY_DIR = os.path.expanduser("~/.ally")
+
+# Longest argument value shown in a tool call notification
+_MAX_ARGUMENT_LENGTH = 200
+
+# Formats non-string argument values without building their full repr
+_ARGUMENT_REPR = reprlib.Repr()
+_ARGUMENT_REPR.maxstring = _MAX_ARGUMENT_LENGTH
+_ARGUMENT_REPR.maxother = _MAX_ARGUMENT_LENGTH
+
+
+def _short_argument(value: Any) -> str:
+    """Format a tool argument for display, truncating long values."""
+    text = value if isinstance(value, str) else _ARGUMENT_REPR.repr(value)
+    if len(text) > _MAX_ARGUMENT_LENGTH:
+        hidden = len(text) - _MAX_ARGUMENT_LENGTH
+        text = f"{text[:_MAX_ARGUMENT_LENGTH]}…(+{hidden} chars)"
+    return text
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_markdown(content: str) -> "Markdown":
+    """Parse markdown once per distinct string.
+
+    Rendering does not modify a Markdown object, so repeated text such as the
+    help message reuses the parsed document. The Markdown module (and its
+    parser) is only imported when the first markdown is printed.
+    """
+    from rich.markdown import Markdown
+
+    return Markdown(content)
+
+
+class _RecentRowsTable:
+    """Table that lays out only the rows that fit on the terminal.
+
+    All rows are kept, but each render builds a table from the most recent
+    ones, so refreshing a plan with hundreds of tasks costs no more than
+    refreshing one that fits on screen.
+    """
+
+    def __init__(
+        self,
+        columns: list[tuple[str, str, int | None]],
+        reserved_lines: int,
+    ) -> None:
+        """Initialize the table.
+
+        Args:
+            columns: (header, style, width) for each column
+            reserved_lines: Terminal lines used by content around the table
+        """
+        self.columns = columns
+        self.reserved_lines = reserved_lines
+        self.rows: list[tuple[str, ...]] = []
+
+    def add_row(self, *cells: str) -> None:
+        """Append a row of cell values."""
+        self.rows.append(cells)
+
+    def __rich_console__(
+        self,
+        console: Console,
+        options: "ConsoleOptions",
+    ) -> "RenderResult":
+        """Render the most recent rows, summarizing the ones left out."""
+        table = Table(box=None, expand=False, show_header=True)
+        for header, style, width in self.columns:
+            table.add_column(header, style=style, width=width)
+
+        rows = self.rows
+        # Output that is not a terminal does not scroll, so it gets every row
+        if console.is_terminal:
+            max_rows = max(2, console.size.height - self.reserved_lines)
+            if len(rows) > max_rows:
+                hidden = len(rows) - max_rows + 1
+                table.add_row("…", f"{hidden} earlier tasks", style="dim")
+                rows = rows[hidden:]
+        for row in rows:
+            table.add_row(*row)
+        yield table
+
+
+class _SynchronizedLive(Live):
+    """Live display that draws each frame as a synchronized terminal update."""
+
+    def refresh(self) -> None:
+        """Redraw the display between synchronized output markers."""
+        console = self.console
+        if (
+            not console.is_terminal
+            or console.is_dumb_terminal
+            or console.legacy_windows
+        ):
+            super().refresh()
+            return
+
+        with self._lock:
+            console.file.write(_SYNC_OUTPUT_BEGIN)
+            try:
+                super().refresh()
+            finally:
+                console.file.write(_SYNC_OUTPUT_END)
+                console.file.flush()
+
 
 class UIManager:
     """Manages UI rendering and user interaction."""
@@ -32,14 +165,32 @@ class UIManager:
         self.active_live_display: Live | None = (
             None  # Track the current active Live display
         )
-        self.plan_tasks_table: Table | None = None
+        self.plan_tasks_table: _RecentRowsTable | None = None
         self.plan_panel: Panel | None = None
         self.plan_panel_group: Any | None = None
         self.agent = None
 
-        # Create history directory if it doesn't exist
-        history_dir = os.path.expanduser("~/.ally")
-        os.makedirs(history_dir, exist_ok=True)
+        # Interactive planning state
+        self.current_interactive_plan: dict[str, str] | None = None
+        self.current_interactive_plan_tasks: list[dict[str, Any]] = []
+
+        # Plan spinner thread state
+        self._thinking_thread: threading.Thread | None = None
+        # Set to stop the plan spinner; waiting on it keeps shutdown immediate
+        self._stop_thinking_event = threading.Event()
+
+    @functools.cached_property
+    def prompt_session(self) -> "PromptSession":
+        """Prompt session with command history and custom key bindings.
+
+        Built on first use so UI managers that never prompt skip creating the
+        history directory and loading prompt_toolkit.
+        """
+        os.makedirs(_HISTORY_DIR, exist_ok=True)
+
+        from prompt_toolkit import PromptSession
+        from prompt_toolkit.history import FileHistory
+        from prompt_toolkit.key_binding import KeyBindings
 
         # Create custom key bindings
         kb = KeyBindings()
@@ -57,22 +208,11 @@ class UIManager:
                 # If empty, exit as normal by raising KeyboardInterrupt
                 event.app.exit(exception=KeyboardInterrupt())
 
-        # Initialize prompt session with command history and custom key bindings
-        history_file = os.path.join(history_dir, "command_history")
-        self.prompt_session: PromptSession = PromptSession(
-            history=FileHistory(history_file),
+        return PromptSession(
+            history=FileHistory(os.path.join(_HISTORY_DIR, "command_history")),
             key_bindings=kb,
         )
 
-        # Interactive planning state
-        self.current_interactive_plan: dict[str, str] | None = None
-        self.current_interactive_plan_tasks: list[dict[str, Any]] = []
-
-        # Add these attributes
-        # These are already defined above with proper types, so remove duplicates
-        self._thinking_thread: threading.Thread | None = None
-        self._stop_thinking_flag = False
-
     def set_verbose(self, verbose: bool) -> None:
         """Set verbose mode.
 
@@ -90,15 +230,20 @@ class UIManager:
 
         self.thinking_event.clear()
 
-        def animate() -> None:
-            # Determine display color based on token percentage
+        # The status prefix is fixed for the whole animation, so build it once
+        if token_percentage > 0:
             if token_percentage > 80:
                 color = "red"
             elif token_percentage > 50:
                 color = "yellow"
             else:
                 color = "green"
+            context_info = f"({token_percentage}% context used)"
+            prefix = f"[cyan]Thinking[/] [dim {color}]{context_info}[/] "
+        else:
+            prefix = "[cyan]Thinking[/] "
 
+        def animate() -> None:
             # Show special intro message in verbose mode
             if self.verbose:
                 self.console.print(
@@ -110,26 +255,30 @@ class UIManager:
                     highlight=False,
                 )
 
-            start_time = time.time()
+            # Piped or redirected output cannot show an animation, so there is
+            # nothing to refresh until the response arrives
+            if not self.console.is_terminal:
+                return
+
+            # The spinner animates on each Live refresh by itself; its text only
+            # needs replacing when the elapsed seconds change
+            spinner = self.thinking_spinner
+            last_elapsed = -1
+            start_time = time.monotonic()
             try:
                 with Live(
-                    self.thinking_spinner,
-                    refresh_per_second=10,
+                    spinner,
+                    refresh_per_second=8,
                     console=self.console,
                 ) as live:
                     # Store reference to current live display
                     self.active_live_display = live
                     while not self.thinking_event.is_set():
-                        elapsed_seconds = int(time.time() - start_time)
-                        if token_percentage > 0:
-                            context_info = f"({token_percentage}% context used)"
-                            thinking_text = f"[cyan]Thinking[/] [dim {color}]{context_info}[/] [{elapsed_seconds}s]"
-                        else:
-                            thinking_text = f"[cyan]Thinking[/] [{elapsed_seconds}s]"
-
-                        spinner = Spinner("dots2", text=thinking_text)
-                        live.update(spinner)
-                        time.sleep(0.1)
+                        elapsed_seconds = int(time.monotonic() - start_time)
+                        if elapsed_seconds != last_elapsed:
+                            last_elapsed = elapsed_seconds
+                            spinner.update(text=f"{prefix}[{elapsed_seconds}s]")
+                        self.thinking_event.wait(0.2)
             finally:
                 # Clear the reference when done
                 if self.active_live_display:
@@ -163,22 +312,35 @@ class UIManager:
         title: str | None = None,
         border_style: str | None = None,
         use_markdown: bool = False,
+        markup: bool | None = None,
     ) -> None:
-        """Print content with optional styling and panel."""
+        """Print content with optional styling and panel.
+
+        Args:
+            content: The content to print
+            style: Style applied to the whole content as plain text
+            panel: Whether to wrap the content in a panel
+            title: Panel title
+            border_style: Panel border style
+            use_markdown: Whether to render the content as markdown
+            markup: Whether unstyled content contains Rich markup. When None,
+                this is guessed from the presence of closing tags.
+        """
         renderable: Any = content
         if isinstance(content, str):
             if use_markdown:
-                renderable = Markdown(content)
+                renderable = _parse_markdown(content)
             elif style:
                 # Use Rich's Text object for styled content
                 renderable = Text(content, style=style)
             else:
-                # Check if the content has Rich formatting tags
-                if "[" in content and "]" in content and "/]" in content:
-                    # Let Rich render the formatting
-                    renderable = content
-                else:
-                    # For plain text with no Rich tags
+                if markup is None:
+                    # A closing tag ("/]") is the rarest part of markup, so it
+                    # is checked first; it also implies a "]" is present
+                    markup = "/]" in content and "[" in content
+                # Markup stays a string so Rich renders the formatting; plain
+                # text is wrapped so brackets in it are not parsed as tags
+                if not markup:
                     renderable = Text(content)
 
         if panel:
@@ -216,7 +378,7 @@ class UIManager:
 
     def print_tool_call(self, tool_name: str, arguments: dict) -> None:
         """Print a tool call notification."""
-        args_str = ", ".join(f"{k}={v}" for k, v in arguments.items())
+        args_str = ", ".join(f"{k}={_short_argument(v)}" for k, v in arguments.items())
         self.print_content(f"> Running {tool_name}({args_str})", style="dim yellow")
 
     def print_error(self, message: str) -> None:
@@ -242,7 +404,9 @@ class UIManager:
             The user's confirmation choice
         """
         prompt_text = f"{prompt} (Y/n)" if default else f"{prompt} (y/N)"
-        response = self.prompt_session.prompt(f"\n{prompt_text} > ")
+        # A y/n answer needs neither history nor key bindings, so read it with
+        # a plain line read rather than starting a prompt_toolkit application
+        response = self.console.input(f"\n{prompt_text} > ", markup=False)
 
         # Handle empty response
         if not response:
@@ -263,22 +427,7 @@ class UIManager:
 
     def print_help(self) -> None:
         """Print help information."""
-        help_text = """
-# Code Ally Commands
-
-- `/help` - Show this help message
-- `/clear` - Clear the conversation history
-- `/config` - Show or update configuration settings
-- `/debug` - Toggle debug mode
-- `/dump` - Dump the conversation history to file
-- `/compact` - Compact the conversation to reduce context size
-- `/trust` - Show trust status for tools
-- `/verbose` - Toggle verbose mode (show model thinking)
-
-Type a message to chat with the AI assistant.
-Use up/down arrow keys to navigate through command history.
-"""
-        self.print_markdown(help_text)
+        self.print_markdown(_HELP_TEXT)
 
     # ----- Interactive Planning UI Methods -----
 
@@ -293,32 +442,34 @@ Use up/down arrow keys to navigate through command history.
         self.current_interactive_plan = {"name": name, "description": description}
         self.current_interactive_plan_tasks = []
 
-        # Create the initial table for tasks
-        table = Table(box=None, expand=False, show_header=True)
-
-        # We'll show a full set of columns so the single panel can carry
-        # everything from creation to finalization:
-        table.add_column("#", style="dim", width=3)
-        table.add_column("Task ID", style="cyan")
-        table.add_column("Tool", style="green")
-        table.add_column("Description", style="yellow")
-        table.add_column("Dependencies", style="blue")
-        table.add_column("Conditional", style="magenta")
-
-        self.plan_tasks_table = table
+        # Create the initial table for tasks. We'll show a full set of columns
+        # so the single panel can carry everything from creation to
+        # finalization; the panel border, header lines and table header take
+        # up the terminal lines reserved around the rows
+        self.plan_tasks_table = _RecentRowsTable(
+            [
+                ("#", "dim", 3),
+                ("Task ID", "cyan", None),
+                ("Tool", "green", None),
+                ("Description", "yellow", None),
+                ("Dependencies", "blue", None),
+                ("Conditional", "magenta", None),
+            ],
+            reserved_lines=8,
+        )
 
-        # Create the header text
+        # Create the header text; it is built once per plan and the Live
+        # display reuses it on every refresh
         from rich.console import Group
-        from rich.text import Text
 
         header_content = Text.assemble(
-            Text("Name: ", style="bold"),
-            Text(name),
-            Text("\n"),
-            Text("Description: ", style="bold"),
-            Text(description),
-            Text("\n\n"),
-            Text("Tasks:", style="bold cyan"),
+            ("Name: ", "bold"),
+            name,
+            "\n",
+            ("Description: ", "bold"),
+            description,
+            "\n\n",
+            ("Tasks:", "bold cyan"),
         )
 
         # Group the header and tasks table - store this separately
@@ -327,8 +478,6 @@ Use up/down arrow keys to navigate through command history.
             self.plan_panel_group = panel_group
 
         # Create the panel - use the group
-        from rich.panel import Panel
-
         title_text = Text("📋 Creating Task Plan", style="bold blue")
         if self.plan_panel_group:
             self.plan_panel = Panel(
@@ -338,11 +487,15 @@ Use up/down arrow keys to navigate through command history.
                 expand=False,
             )
 
-        # Start the live display with the panel
-        from rich.live import Live
-
-        if self.plan_panel:
-            live = Live(self.plan_panel, console=self.console, refresh_per_second=4)
+        # Start the live display with the panel; Live already hides the
+        # cursor, and synchronized frames avoid tearing on slow terminals.
+        # Without a terminal the panel is printed once, when it is confirmed
+        if self.plan_panel and self.console.is_terminal:
+            live = _SynchronizedLive(
+                self.plan_panel,
+                console=self.console,
+                refresh_per_second=4,
+            )
             self.active_live_display = live
             live.start()
 
@@ -401,9 +554,8 @@ Use up/down arrow keys to navigate through command history.
                 depends_txt,
                 condition_str,
             )
-
-        if self.active_live_display:
-            self.active_live_display.update(self.plan_panel)
+        # The live display already shows this table and redraws it on its
+        # own refresh schedule, so the new row needs no explicit update
 
     def confirm_interactive_plan(self, plan_name: str) -> bool:
         """Finalize the plan display and ask for confirmation."""
@@ -412,6 +564,8 @@ Use up/down arrow keys to navigate through command history.
         if self.active_live_display:
             self.active_live_display.stop()
             self.active_live_display = None
+        elif self.plan_panel:
+            self.console.print(self.plan_panel)
         return self.confirm(f"Execute the task plan '{plan_name}'?", default=True)
 
     def start_plan_thinking(self) -> None:
@@ -427,7 +581,7 @@ Use up/down arrow keys to navigate through command history.
         if self._thinking_thread and self._thinking_thread.is_alive():
             return
 
-        self._stop_thinking_flag = False
+        self._stop_thinking_event.clear()
         self._thinking_thread = threading.Thread(
             target=self._plan_spinner_loop,
             daemon=True,
@@ -436,7 +590,7 @@ Use up/down arrow keys to navigate through command history.
 
     def stop_plan_thinking(self) -> None:
         """Stop the plan spinner thread, restore the title back to normal."""
-        self._stop_thinking_flag = True
+        self._stop_thinking_event.set()
         if self._thinking_thread and self._thinking_thread.is_alive():
             self._thinking_thread.join(timeout=2.0)
         self._thinking_thread = None
@@ -469,9 +623,7 @@ Use up/down arrow keys to navigate through command history.
         # or "TASK PLAN: Whatever"
         base_title_str = str(self.plan_panel.title)
 
-        while not self._stop_thinking_flag:
-            from rich.text import Text
-
+        while not self._stop_thinking_event.is_set():
             frame = spinner_frames[index % len(spinner_frames)]
             index += 1
 
@@ -482,7 +634,7 @@ Use up/down arrow keys to navigate through command history.
             if self.active_live_display:
                 self.active_live_display.update(self.plan_panel)
 
-            time.sleep(0.3)
+            self._stop_thinking_event.wait(0.3)
 
         # Once we exit, revert to the original base_title_str
         self.plan_panel.title = Text(base_title_str, style="bold blue")
@@ -7,6 +7,7 @@ details are modularized under the 'tool_guidance' package.
 """
 
 import contextlib
+import functools
 import os
 import platform
 import sys
@@ -80,16 +81,32 @@ Each tool's description includes a specific example of its proper usage format.
 """
 
 
-def get_main_system_prompt() -> str:
-    """Generate the main system prompt dynamically, incorporating available tools.
+@functools.cache
+def _static_prompt_parts() -> tuple[str, str, str]:
+    """Collect the prompt details that cannot change while the process runs.
 
     Returns:
-        The system prompt string with directives and tool list.
+        Tuple of (tool list, operating system, Python version)
     """
     # Import here to avoid circular imports
     from code_ally.tools import ToolRegistry
 
     tool_list = ToolRegistry().get_tools_for_prompt()
+    os_info = f"{platform.system()} {platform.release()}"
+    python_version = sys.version.split()[0]
+    return tool_list, os_info, python_version
+
+
+def get_main_system_prompt() -> str:
+    """Generate the main system prompt dynamically, incorporating available tools.
+
+    The tool list and platform details are gathered once per process; the
+    date, working directory and directory tree are read on every call.
+
+    Returns:
+        The system prompt string with directives and tool list.
+    """
+    tool_list, os_info, python_version = _static_prompt_parts()
 
     current_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     working_dir = ""
@@ -126,10 +143,6 @@ def get_main_system_prompt() -> str:
         except Exception as e:
             directory_tree = f"Unable to generate directory tree: {str(e)}"
 
-    # Get additional contextual details
-    os_info = f"{platform.system()} {platform.release()}"
-    python_version = sys.version.split()[0]
-
     context = f"""
 - Current Date: {current_date}
 - Working Directory (pwd): {working_dir}
@@ -17,6 +17,9 @@ class BaseTool(ABC):
     - requires_confirmation: Whether user confirmation is required before execution
     - execute(): Method to perform the tool's action
 
+    Tools may also set is_pure to True when they only read state, so that
+    identical calls within a task plan can reuse an earlier result.
+
     Tool implementations should inherit from this class and implement
     the execute method with appropriate typing.
     """
@@ -24,6 +27,7 @@ class BaseTool(ABC):
     name: ClassVar[str]
     description: ClassVar[str]
     requires_confirmation: ClassVar[bool]
+    is_pure: ClassVar[bool] = False
 
     def __init__(self) -> None:
         """Initialize the tool.
@@ -35,6 +35,7 @@ class CodeStructureAnalyzerTool(BaseTool):
     - Multiple programming languages (Python, JavaScript, TypeScript, etc.)
     """
     requires_confirmation = False
+    is_pure = True
 
     # Languages that can be analyzed
     SUPPORTED_LANGUAGES = {
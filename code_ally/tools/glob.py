@@ -31,6 +31,7 @@ class GlobTool(BaseTool):
     - Error handling for non-existent directories
     """
     requires_confirmation = False
+    is_pure = True
 
     # pylint: disable=arguments-differ,too-many-arguments,too-many-locals,too-many-branches
     def execute(
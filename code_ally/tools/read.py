@@ -33,6 +33,7 @@ class FileReadTool(BaseTool):
     - Finding sections by headings or markers (section_pattern)
     """
     requires_confirmation = False
+    is_pure = True
 
     def execute(
         self,
@@ -10,6 +10,7 @@ This module provides security features for Code Ally, including:
 import logging
 import os
 import re
+import threading
 from dataclasses import dataclass
 from enum import Enum, auto
 
@@ -398,6 +399,8 @@ class TrustManager:
         self.auto_confirm = False
         # Track pre-approved operations (simpler implementation)
         self.pre_approved_operations: set[str] = set()
+        # Serializes permission prompts when tools run concurrently
+        self.lock = threading.RLock()
 
         logger.debug("TrustManager initialized")
 
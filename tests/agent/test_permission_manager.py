@@ -0,0 +1,103 @@
+"""Tests for the PermissionManager class.
+
+This file contains tests for the PermissionManager class, which checks trust and
+directory restrictions before tools are allowed to run.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from code_ally.agent.permission_manager import PermissionManager
+
+
+@pytest.fixture
+def trust_manager() -> MagicMock:
+    """Create a mock trust manager for testing."""
+    mock_trust = MagicMock()
+    mock_trust.is_trusted.return_value = False
+    mock_trust.prompt_for_permission.return_value = True
+    return mock_trust
+
+
+@pytest.fixture
+def permission_manager(trust_manager: MagicMock) -> PermissionManager:
+    """Create a permission manager instance for testing."""
+    return PermissionManager(trust_manager)
+
+
+def test_get_permission_path(permission_manager: PermissionManager) -> None:
+    """Test extracting the permission path from tool arguments."""
+    bash_args = {"command": "ls"}
+    assert permission_manager._get_permission_path("bash", bash_args) is bash_args
+    assert (
+        permission_manager._get_permission_path(
+            "file_write",
+            {"content": "x", "path": "a.txt"},
+        )
+        == "a.txt"
+    )
+    assert permission_manager._get_permission_path("file_read", {"limit": 5}) is None
+
+
+def test_check_permission_caches_within_batch(
+    permission_manager: PermissionManager,
+    trust_manager: MagicMock,
+) -> None:
+    """Test that granted permissions are reused within the same batch."""
+    arguments = {"path": "file.txt"}
+
+    assert permission_manager.check_permission("file_write", arguments, "batch1")
+    assert permission_manager.check_permission("file_write", arguments, "batch1")
+
+    # Only the first call should reach the trust manager
+    trust_manager.prompt_for_permission.assert_called_once()
+
+
+def test_check_permission_cache_reset_on_new_batch(
+    permission_manager: PermissionManager,
+    trust_manager: MagicMock,
+) -> None:
+    """Test that cached permissions do not leak into a different batch."""
+    arguments = {"path": "file.txt"}
+
+    permission_manager.check_permission("file_write", arguments, "batch1")
+    permission_manager.check_permission("file_write", arguments, "batch2")
+
+    assert trust_manager.prompt_for_permission.call_count == 2
+
+
+def test_check_permission_without_batch_is_not_cached(
+    permission_manager: PermissionManager,
+    trust_manager: MagicMock,
+) -> None:
+    """Test that calls outside a batch always consult the trust manager."""
+    arguments = {"command": "echo hi"}
+
+    permission_manager.check_permission("bash", arguments)
+    permission_manager.check_permission("bash", arguments)
+
+    assert trust_manager.prompt_for_permission.call_count == 2
+
+
+def test_check_permission_bash_commands_cached_by_command(
+    permission_manager: PermissionManager,
+    trust_manager: MagicMock,
+) -> None:
+    """Test that bash permissions in a batch are keyed by command text."""
+    permission_manager.check_permission("bash", {"command": "pwd"}, "batch1")
+    permission_manager.check_permission("bash", {"command": "pwd"}, "batch1")
+    permission_manager.check_permission("bash", {"command": "ls"}, "batch1")
+
+    assert trust_manager.prompt_for_permission.call_count == 2
+
+
+def test_check_permission_pathless_tools_cached_separately(
+    permission_manager: PermissionManager,
+    trust_manager: MagicMock,
+) -> None:
+    """Test that tools without a path argument do not share cache entries."""
+    permission_manager.check_permission("tool_a", {}, "batch1")
+    permission_manager.check_permission("tool_b", {}, "batch1")
+
+    assert trust_manager.prompt_for_permission.call_count == 2
@@ -0,0 +1,692 @@
+"""Tests for the TaskPlanner class.
+
+This file contains tests for the TaskPlanner class, which validates and executes
+multi-step task plans in the CodeAlly system.
+"""
+
+import json
+import threading
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from code_ally.agent._task_planner_core import critical_path, index_plan
+from code_ally.agent.task_planner import TaskPlanner
+from code_ally.agent.tool_manager import ToolManager
+
+
+@pytest.fixture
+def tool_manager() -> MagicMock:
+    """Create a mock tool manager with a couple of registered tools."""
+    mock_manager = MagicMock()
+    mock_manager.tools = {
+        "bash": MagicMock(requires_confirmation=False),
+        "file_read": MagicMock(requires_confirmation=False),
+    }
+    mock_manager.confirming_tool_names = frozenset()
+    mock_manager._get_permission_path.side_effect = ToolManager._get_permission_path
+    mock_manager.execute_tool.return_value = {"success": True, "output": "ok"}
+    return mock_manager
+
+
+@pytest.fixture
+def task_planner(tool_manager: MagicMock) -> TaskPlanner:
+    """Create a task planner instance for testing."""
+    return TaskPlanner(tool_manager)
+
+
+def test_process_template_vars(task_planner: TaskPlanner) -> None:
+    """Test substituting task results and static values into arguments."""
+    template_vars = {
+        "dir": {"type": "task_result", "task_id": "pwd", "field": "output"},
+        "name": {"type": "static", "value": "hello.sh"},
+    }
+    results = {"pwd": {"success": True, "output": "/work\n"}}
+    arguments = {
+        "path": "${dir}/${name}",
+        "options": {"mode": "${name}"},
+        "unknown": "${missing}",
+        "count": 3,
+    }
+
+    processed = task_planner._process_template_vars(
+        arguments,
+        template_vars,
+        results,
+    )
+
+    assert processed["path"] == "/work/hello.sh"
+    assert processed["options"] == {"mode": "hello.sh"}
+    assert processed["unknown"] == "${missing}"
+    assert processed["count"] == 3
+
+
+def test_process_template_vars_uses_default(task_planner: TaskPlanner) -> None:
+    """Test that defaults are used when the referenced task has no result."""
+    template_vars = {
+        "dir": {"type": "task_result", "task_id": "pwd", "default": "/tmp"},
+    }
+
+    processed = task_planner._process_template_vars(
+        {"path": "${dir}/out.txt"},
+        template_vars,
+        {},
+    )
+
+    assert processed["path"] == "/tmp/out.txt"
+
+
+def test_execute_plan_respects_dependencies(
+    task_planner: TaskPlanner,
+    tool_manager: MagicMock,
+) -> None:
+    """Test that tasks run after their dependencies regardless of list order."""
+    plan = {
+        "name": "Ordered plan",
+        "description": "Dependency listed after its dependent",
+        "tasks": [
+            {
+                "id": "second",
+                "tool_name": "bash",
+                "arguments": {"command": "echo second"},
+                "depends_on": ["first"],
+            },
+            {"id": "first", "tool_name": "bash", "arguments": {"command": "pwd"}},
+        ],
+    }
+
+    result = task_planner.execute_plan(plan)
+
+    assert result["success"] is True
+    assert result["completed_tasks"] == ["first", "second"]
+    executed = [
+        call.args[1]["command"] for call in tool_manager.execute_tool.mock_calls
+    ]
+    assert executed == ["pwd", "echo second"]
+
+
+def test_execute_plan_parallel_layer(
+    task_planner: TaskPlanner,
+    tool_manager: MagicMock,
+) -> None:
+    """Test that independent tasks complete when run concurrently."""
+    plan = {
+        "name": "Parallel plan",
+        "description": "Independent reads",
+        "max_parallel": 4,
+        "tasks": [
+            {"id": f"read{i}", "tool_name": "file_read", "arguments": {"path": f"{i}"}}
+            for i in range(4)
+        ],
+    }
+
+    result = task_planner.execute_plan(plan)
+
+    assert result["success"] is True
+    assert sorted(result["completed_tasks"]) == ["read0", "read1", "read2", "read3"]
+    assert tool_manager.execute_tool.call_count == 4
+
+
+def test_validate_plan_detects_long_cycle(task_planner: TaskPlanner) -> None:
+    """Test that cycles longer than two tasks are rejected."""
+    plan = {
+        "name": "Cyclic plan",
+        "description": "a -> b -> c -> a",
+        "tasks": [
+            {"id": "a", "tool_name": "bash", "depends_on": ["c"]},
+            {"id": "b", "tool_name": "bash", "depends_on": ["a"]},
+            {"id": "c", "tool_name": "bash", "depends_on": ["b"]},
+        ],
+    }
+
+    is_valid, error = task_planner.validate_plan(plan)
+
+    assert is_valid is False
+    assert "Circular dependency detected" in error
+
+
+def test_process_template_vars_in_lists(task_planner: TaskPlanner) -> None:
+    """Test that list items resolve task results like plain strings do."""
+    template_vars = {
+        "file": {"type": "task_result", "task_id": "find", "field": "output"},
+    }
+    results = {"find": {"success": True, "output": "main.py"}}
+
+    processed = task_planner._process_template_vars(
+        {"files": ["${file}", {"name": "${file}"}, 1]},
+        template_vars,
+        results,
+    )
+
+    assert processed["files"] == ["main.py", {"name": "main.py"}, 1]
+
+
+def test_process_template_vars_without_placeholders(
+    task_planner: TaskPlanner,
+) -> None:
+    """Test that arguments without placeholders skip variable resolution."""
+    template_vars = {"dir": {"type": "task_result", "task_id": "pwd"}}
+    arguments = {"path": "plain.txt", "options": {"flags": ["-a", 1]}}
+    task_planner._resolve_template_var = MagicMock()
+
+    processed = task_planner._process_template_vars(arguments, template_vars, {})
+
+    assert processed is arguments
+    task_planner._resolve_template_var.assert_not_called()
+
+
+def test_execution_history_is_bounded(task_planner: TaskPlanner) -> None:
+    """Test that the execution history keeps only the most recent entries."""
+    plan = {
+        "name": "History plan",
+        "description": "More tasks than the history limit",
+        "history_limit": 2,
+        "tasks": [
+            {"id": f"task{i}", "tool_name": "bash", "arguments": {"command": "pwd"}}
+            for i in range(3)
+        ],
+    }
+
+    task_planner.execute_plan(plan)
+
+    history = list(task_planner.execution_history)
+    assert [entry["task_id"] for entry in history] == ["task1", "task2"]
+    assert "arguments" not in history[0]
+
+
+def test_execute_plan_skips_descendants_of_failed_task(
+    task_planner: TaskPlanner,
+    tool_manager: MagicMock,
+) -> None:
+    """Test that a failure skips every task downstream of it."""
+    tool_manager.execute_tool.side_effect = [
+        {"success": False, "error": "boom"},
+        {"success": True, "output": "ok"},
+    ]
+    plan = {
+        "name": "Failing plan",
+        "description": "a fails, b and c depend on it transitively",
+        "tasks": [
+            {"id": "a", "tool_name": "bash", "arguments": {"command": "false"}},
+            {"id": "b", "tool_name": "bash", "depends_on": ["a"]},
+            {"id": "c", "tool_name": "bash", "depends_on": ["b"]},
+            {"id": "d", "tool_name": "bash", "arguments": {"command": "true"}},
+        ],
+    }
+
+    result = task_planner.execute_plan(plan)
+
+    assert result["completed_tasks"] == ["d"]
+    assert result["failed_tasks"] == ["a", "b", "c"]
+    assert result["results"]["c"]["error"] == "Dependencies not met"
+    assert tool_manager.execute_tool.call_count == 2
+
+
+def test_evaluate_condition(task_planner: TaskPlanner) -> None:
+    """Test task_result comparisons and unknown condition types."""
+    results = {"check": {"success": False, "output": "missing"}}
+
+    assert task_planner._evaluate_condition(
+        {"type": "task_result", "task_id": "check", "value": False},
+        results,
+    )
+    assert task_planner._evaluate_condition(
+        {
+            "type": "task_result",
+            "task_id": "check",
+            "field": "output",
+            "operator": "not_equals",
+            "value": "found",
+        },
+        results,
+    )
+    assert not task_planner._evaluate_condition(
+        {"type": "task_result", "task_id": "other"},
+        results,
+    )
+    assert not task_planner._evaluate_condition({"type": "unknown"}, results)
+
+
+def test_whole_result_serialized_once(task_planner: TaskPlanner) -> None:
+    """Test that a whole task result is JSON-encoded once across variables."""
+    template_vars = {
+        "first": {"type": "task_result", "task_id": "info"},
+        "second": {"type": "task_result", "task_id": "info"},
+    }
+    results = {"info": {"success": True, "output": "x"}}
+
+    with patch("code_ally.agent.task_planner.json.dumps", wraps=json.dumps) as dumps:
+        processed = task_planner._process_template_vars(
+            {"a": "${first}", "b": "${second}"},
+            template_vars,
+            results,
+        )
+
+    assert processed["a"] == processed["b"] == json.dumps(results["info"])
+    dumps.assert_called_once()
+
+
+def test_verbose_print_skips_markup(task_planner: TaskPlanner) -> None:
+    """Test that verbose messages print only in verbose mode, without markup."""
+    task_planner.ui = MagicMock()
+
+    task_planner._verbose_print("hidden", "dim cyan")
+    task_planner.ui.console.print.assert_not_called()
+
+    task_planner.set_verbose(True)
+    task_planner._verbose_print("Task '[x]' ran", "dim cyan")
+
+    task_planner.ui.console.print.assert_called_once_with(
+        "[Verbose] Task '[x]' ran",
+        style="dim cyan",
+        markup=False,
+        highlight=False,
+    )
+
+
+def test_process_template_vars_in_nested_lists(task_planner: TaskPlanner) -> None:
+    """Test that placeholders inside nested lists are substituted."""
+    template_vars = {"flag": {"type": "static", "value": "-v"}}
+
+    processed = task_planner._process_template_vars(
+        {"argv": [["${flag}", None], "${flag}"]},
+        template_vars,
+        {},
+    )
+
+    assert processed["argv"] == [["-v", None], "-v"]
+
+
+def test_execute_plan_rejects_invalid_plan(
+    task_planner: TaskPlanner,
+    tool_manager: MagicMock,
+) -> None:
+    """Test that execute_plan reports validation errors without running tasks."""
+    plan = {
+        "name": "Broken plan",
+        "description": "Depends on a missing task",
+        "tasks": [{"id": "a", "tool_name": "bash", "depends_on": ["missing"]}],
+    }
+
+    result = task_planner.execute_plan(plan)
+
+    assert result["success"] is False
+    assert result["error"] == "Invalid plan: Task 'a' depends on unknown task 'missing'"
+    tool_manager.execute_tool.assert_not_called()
+
+
+@pytest.mark.parametrize("value", ["ten", None, [5], True])
+def test_execute_plan_rejects_non_integer_history_limit(
+    task_planner: TaskPlanner,
+    tool_manager: MagicMock,
+    value: Any,
+) -> None:
+    """Test that a malformed history_limit is reported as an invalid plan."""
+    plan = {
+        "name": "Limit plan",
+        "description": "Has a history limit that is not an integer",
+        "history_limit": value,
+        "tasks": [{"id": "a", "tool_name": "bash", "arguments": {"command": "ls"}}],
+    }
+
+    result = task_planner.execute_plan(plan)
+
+    assert result["success"] is False
+    assert result["error"] == (
+        "Invalid plan: Plan has invalid 'history_limit' (must be an integer)"
+    )
+    tool_manager.execute_tool.assert_not_called()
+
+
+def test_process_template_vars_nested_field(task_planner: TaskPlanner) -> None:
+    """Test resolving dotted field paths, falling back to the default."""
+    template_vars = {
+        "value": {"type": "task_result", "task_id": "fetch", "field": "data.value"},
+        "missing": {
+            "type": "task_result",
+            "task_id": "fetch",
+            "field": "data.other.value",
+            "default": "none",
+        },
+    }
+    results = {"fetch": {"success": True, "data": {"value": 42}}}
+
+    processed = task_planner._process_template_vars(
+        {"text": "${value}/${missing}"},
+        template_vars,
+        results,
+    )
+
+    assert processed["text"] == "42/none"
+
+
+def test_validate_plan_rejects_unsupported_conditions_and_vars(
+    task_planner: TaskPlanner,
+) -> None:
+    """Test that expression conditions and incomplete template vars fail early."""
+    expression_plan = {
+        "name": "Expression plan",
+        "description": "Uses an expression condition",
+        "tasks": [
+            {
+                "id": "a",
+                "tool_name": "bash",
+                "condition": {"type": "expression", "expression": "True"},
+            },
+        ],
+    }
+    template_plan = {
+        "name": "Template plan",
+        "description": "Static variable without a value",
+        "tasks": [
+            {
+                "id": "a",
+                "tool_name": "bash",
+                "template_vars": {"name": {"type": "static"}},
+            },
+        ],
+    }
+
+    is_valid, error = task_planner.validate_plan(expression_plan)
+    assert is_valid is False
+    assert "not supported" in error
+
+    is_valid, error = task_planner.validate_plan(template_plan)
+    assert is_valid is False
+    assert error == "Task 'a' template variable 'name' missing 'value' field"
+
+
+def test_execute_plan_starts_tasks_as_dependencies_finish(
+    task_planner: TaskPlanner,
+    tool_manager: MagicMock,
+) -> None:
+    """Test that a ready task starts without waiting for unrelated tasks."""
+    follow_up_started = threading.Event()
+
+    def execute_tool(
+        tool_name: str,
+        arguments: dict,
+        *args: Any,
+        **kwargs: Any,
+    ) -> dict:
+        if arguments["command"] == "slow":
+            # Only finishes once the follow-up task has been started
+            assert follow_up_started.wait(timeout=5)
+        elif arguments["command"] == "follow-up":
+            follow_up_started.set()
+        return {"success": True, "output": arguments["command"]}
+
+    tool_manager.execute_tool.side_effect = execute_tool
+    plan = {
+        "name": "Frontier plan",
+        "description": "follow-up only depends on the fast task",
+        "max_parallel": 2,
+        "tasks": [
+            {"id": "slow", "tool_name": "bash", "arguments": {"command": "slow"}},
+            {"id": "fast", "tool_name": "bash", "arguments": {"command": "fast"}},
+            {
+                "id": "follow-up",
+                "tool_name": "bash",
+                "arguments": {"command": "follow-up"},
+                "depends_on": ["fast"],
+            },
+        ],
+    }
+
+    result = task_planner.execute_plan(plan)
+
+    assert result["success"] is True
+    assert sorted(result["completed_tasks"]) == ["fast", "follow-up", "slow"]
+
+
+def test_execute_plan_waits_for_tasks_whose_results_are_read(
+    task_planner: TaskPlanner,
+    tool_manager: MagicMock,
+) -> None:
+    """Test that parallel tasks wait for results their condition and vars read."""
+    tool_manager.execute_tool.side_effect = (
+        lambda tool_name, arguments, *args, **kwargs: {
+            "success": arguments["command"] != "probe",
+            "output": arguments["command"],
+        }
+    )
+    plan = {
+        "name": "Recovery plan",
+        "description": "Recovers when the probe fails",
+        "max_parallel": 2,
+        "tasks": [
+            {"id": "probe", "tool_name": "bash", "arguments": {"command": "probe"}},
+            {
+                "id": "recover",
+                "tool_name": "bash",
+                "arguments": {"command": "fix ${seen}"},
+                "condition": {
+                    "type": "task_result",
+                    "task_id": "probe",
+                    "field": "success",
+                    "value": False,
+                },
+                "template_vars": {
+                    "seen": {
+                        "type": "task_result",
+                        "task_id": "probe",
+                        "field": "output",
+                        "default": "nothing",
+                    },
+                },
+            },
+        ],
+    }
+
+    result = task_planner.execute_plan(plan)
+
+    # The probe's failure does not block a task that only reads its result
+    assert result["failed_tasks"] == ["probe"]
+    assert result["completed_tasks"] == ["recover"]
+    assert result["results"]["recover"]["output"] == "fix probe"
+
+
+def test_critical_path_prefers_longest_chain(task_planner: TaskPlanner) -> None:
+    """Test remaining path lengths computed from per-tool durations."""
+    task_planner._record_tool_duration("bash", 2.0)
+    task_planner._record_tool_duration("file_read", 0.5)
+    plan = {
+        "name": "Chain plan",
+        "description": "A short task and a longer chain",
+        "tasks": [
+            {"id": "short", "tool_name": "file_read"},
+            {"id": "build", "tool_name": "bash"},
+            {"id": "test", "tool_name": "bash", "depends_on": ["build"]},
+        ],
+    }
+
+    _, _, plan_index = index_plan(plan, task_planner.tool_manager.tools)
+    path_length, total = critical_path(
+        plan_index,
+        task_planner._estimate_task_durations(plan_index),
+    )
+
+    assert path_length == {"short": 0.5, "build": 4.0, "test": 2.0}
+    assert total == 4.0
+    assert task_planner._durations_known(plan)
+
+
+def test_process_template_vars_resolves_only_used_vars(
+    task_planner: TaskPlanner,
+) -> None:
+    """Test that each referenced variable is resolved once and others never."""
+    template_vars = {
+        "used": {"type": "static", "value": "a"},
+        "unused": {"type": "static", "value": "b"},
+    }
+
+    with patch.object(
+        task_planner,
+        "_resolve_template_var",
+        wraps=task_planner._resolve_template_var,
+    ) as resolve:
+        processed = task_planner._process_template_vars(
+            {"first": "${used}", "second": ["${used}"]},
+            template_vars,
+            {},
+        )
+
+    assert processed == {"first": "a", "second": ["a"]}
+    resolve.assert_called_once_with(template_vars["used"], {})
+
+
+def test_execute_plan_reuses_pure_tool_results(
+    task_planner: TaskPlanner,
+    tool_manager: MagicMock,
+) -> None:
+    """Test that identical read-only calls run once until something else runs."""
+    tool_manager.tools["file_read"].is_pure = True
+    read = {"tool_name": "file_read", "arguments": {"path": "a.txt"}}
+    plan = {
+        "name": "Read plan",
+        "description": "Reads a file, writes, then reads it again",
+        "tasks": [
+            {"id": "read1", **read},
+            {"id": "read2", **read},
+            {"id": "write", "tool_name": "bash", "arguments": {"command": "touch"}},
+            {"id": "read3", **read, "depends_on": ["write"]},
+        ],
+    }
+
+    result = task_planner.execute_plan(plan)
+
+    assert result["success"] is True
+    executed = [call.args[0] for call in tool_manager.execute_tool.mock_calls]
+    assert executed == ["file_read", "bash", "file_read"]
+
+
+def test_execute_plan_does_not_cache_reads_overlapping_writes(
+    task_planner: TaskPlanner,
+    tool_manager: MagicMock,
+) -> None:
+    """Test that a read running alongside a write is not reused afterwards."""
+    tool_manager.tools["file_read"].is_pure = True
+    files = {"a.txt": "old"}
+    read_started = threading.Event()
+    write_done = threading.Event()
+
+    def execute_tool(
+        tool_name: str,
+        arguments: dict,
+        *args: Any,
+        **kwargs: Any,
+    ) -> dict:
+        if tool_name == "bash":
+            assert read_started.wait(timeout=5)
+            files["a.txt"] = "new"
+            write_done.set()
+            return {"success": True, "output": ""}
+        content = files[arguments["path"]]
+        if not read_started.is_set():
+            # The first read returns what it saw before the write finished
+            read_started.set()
+            assert write_done.wait(timeout=5)
+        return {"success": True, "content": content}
+
+    tool_manager.execute_tool.side_effect = execute_tool
+    read = {"tool_name": "file_read", "arguments": {"path": "a.txt"}}
+    plan = {
+        "name": "Overlap plan",
+        "description": "Reads a file while writing it, then reads it again",
+        "max_parallel": 2,
+        "tasks": [
+            {"id": "read1", **read},
+            {"id": "write", "tool_name": "bash", "arguments": {"command": "edit"}},
+            {"id": "read2", **read, "depends_on": ["read1", "write"]},
+        ],
+    }
+
+    result = task_planner.execute_plan(plan)
+
+    assert result["success"] is True
+    assert result["results"]["read1"]["content"] == "old"
+    assert result["results"]["read2"]["content"] == "new"
+
+
+def test_execute_plan_updates_live_progress(
+    task_planner: TaskPlanner,
+) -> None:
+    """Test that non-verbose runs update the progress table in place."""
+    task_planner.ui = MagicMock(active_live_display=None)
+    plan = {
+        "name": "Live plan",
+        "description": "Single task",
+        "tasks": [{"id": "only", "tool_name": "bash", "arguments": {"command": "ls"}}],
+    }
+
+    with patch("rich.live.Live") as live_cls:
+        result = task_planner.execute_plan(plan)
+
+    assert result["success"] is True
+    live = live_cls.return_value
+    live.start.assert_called_once()
+    assert live.update.call_count >= 2
+    live.stop.assert_called()
+    task_planner.ui.print_tool_call.assert_not_called()
+    assert task_planner.ui.active_live_display is None
+
+
+def test_execute_plan_prints_progress_lines_without_terminal(
+    task_planner: TaskPlanner,
+) -> None:
+    """Test that piped output gets progress lines instead of a live table."""
+    task_planner.ui = MagicMock(active_live_display=None)
+    task_planner.ui.console.is_terminal = False
+    plan = {
+        "name": "Piped plan",
+        "description": "Single task",
+        "tasks": [{"id": "only", "tool_name": "bash", "arguments": {"command": "ls"}}],
+    }
+
+    with patch("rich.live.Live") as live_cls:
+        result = task_planner.execute_plan(plan)
+
+    assert result["success"] is True
+    live_cls.assert_not_called()
+    task_planner.ui.print_tool_call.assert_called_once_with("bash", {"command": "ls"})
+
+
+def test_collect_permission_operations_deduplicates(
+    task_planner: TaskPlanner,
+) -> None:
+    """Test that repeated operations are only listed for approval once."""
+    task_planner.tool_manager.confirming_tool_names = frozenset(
+        {"bash", "file_write", "directory_create", "notify"},
+    )
+    plan = {
+        "tasks": [
+            {"id": "a", "tool_name": "bash", "arguments": {"command": "make"}},
+            {"id": "b", "tool_name": "bash", "arguments": {"command": "make"}},
+            {"id": "c", "tool_name": "file_write", "arguments": {"path": "x.txt"}},
+            {"id": "d", "tool_name": "file_write", "arguments": {"path": "x.txt"}},
+            {"id": "e", "tool_name": "file_read", "arguments": {"path": "x.txt"}},
+            {
+                "id": "f",
+                "tool_name": "directory_create",
+                "arguments": {"directory": "out"},
+            },
+            {
+                "id": "g",
+                "tool_name": "directory_create",
+                "arguments": {"directory": "out"},
+            },
+            {"id": "h", "tool_name": "notify", "arguments": {"message": "one"}},
+            {"id": "i", "tool_name": "notify", "arguments": {"message": "two"}},
+        ],
+    }
+
+    operations = task_planner._collect_permission_operations(plan)
+
+    assert [(tool, path) for tool, path, _ in operations] == [
+        ("bash", {"command": "make"}),
+        ("file_write", "x.txt"),
+        ("directory_create", "out"),
+        ("notify", None),
+        ("notify", None),
+    ]
@@ -6,11 +6,13 @@ validation, and execution in the CodeAlly system.
 
 import os
 import sys
+import threading
+from typing import Any, Optional, Union
 from unittest.mock import MagicMock
 
 import pytest
 
-from code_ally.agent.tool_manager import ToolManager
+from code_ally.agent.tool_manager import ToolManager, _annotation_json_type
 from code_ally.tools.base import BaseTool
 from code_ally.trust import PermissionDeniedError
 
@@ -107,6 +109,11 @@ def test_tool_manager_initialization(
     assert isinstance(tool_manager.tools["protected_tool"], SampleProtectedTool)
 
 
+def test_confirming_tool_names(tool_manager: ToolManager) -> None:
+    """Test that only tools requiring confirmation are listed."""
+    assert tool_manager.confirming_tool_names == frozenset({"protected_tool"})
+
+
 def test_get_function_definitions(tool_manager: ToolManager) -> None:
     """Test getting function definitions for tools."""
     # Get function definitions
@@ -132,6 +139,16 @@ def test_get_function_definitions(tool_manager: ToolManager) -> None:
         assert func_def["function"]["name"] in tool_manager.tools
 
 
+def test_get_function_definitions_cached(tool_manager: ToolManager) -> None:
+    """Test that function definitions are built once and reused."""
+    first = tool_manager.get_function_definitions()
+
+    assert tool_manager.get_function_definitions() is first
+    test_params = first[0]["function"]["parameters"]
+    assert list(test_params["properties"]) == ["param1", "param2"]
+    assert test_params["required"] == []
+
+
 def test_execute_tool_basic(tool_manager: ToolManager) -> None:
     """Test basic tool execution."""
     # Execute a tool
@@ -162,6 +179,32 @@ def test_execute_tool_with_permission(
     assert "Protected operation on /test/path" in result["result"]
 
 
+def test_execute_tool_prompts_under_trust_lock(
+    tool_manager: ToolManager,
+    trust_manager: MagicMock,
+) -> None:
+    """Test that permission prompts hold the trust manager lock."""
+    trust_manager.lock = threading.RLock()
+
+    def prompt(tool_name: str, path: Any) -> bool:
+        # A different thread must not be able to take the lock meanwhile
+        acquired: list[bool] = []
+        other = threading.Thread(
+            target=lambda: acquired.append(trust_manager.lock.acquire(blocking=False)),
+        )
+        other.start()
+        other.join()
+        assert acquired == [False]
+        return True
+
+    trust_manager.prompt_for_permission.side_effect = prompt
+
+    result = tool_manager.execute_tool("protected_tool", {"path": "/test/path"})
+
+    assert result["success"] is True
+    trust_manager.prompt_for_permission.assert_called_once()
+
+
 def test_execute_tool_permission_denied(
     tool_manager: ToolManager,
     trust_manager: MagicMock,
@@ -200,6 +243,19 @@ def test_execute_tool_redundant_call(tool_manager: ToolManager) -> None:
     assert "Identical test_tool call was already executed" in result["error"]
 
 
+def test_execute_tool_redundant_call_with_list_argument(
+    tool_manager: ToolManager,
+) -> None:
+    """Test redundancy tracking for unhashable arguments and turn resets."""
+    arguments = {"param1": ["a", "b"]}
+    tool_manager.execute_tool("test_tool", arguments)
+
+    assert tool_manager.execute_tool("test_tool", arguments)["success"] is False
+
+    tool_manager.reset_turn()
+    assert tool_manager.execute_tool("test_tool", arguments)["success"] is True
+
+
 def test_execute_tool_error_handling(tool_manager: ToolManager) -> None:
     """Test error handling during tool execution."""
     # Make the tool raise an exception
@@ -214,3 +270,19 @@ def test_execute_tool_error_handling(tool_manager: ToolManager) -> None:
     assert result["success"] is False
     assert "Error executing test_tool" in result["error"]
     assert "Test error" in result["error"]
+
+
+@pytest.mark.parametrize(
+    ("annotation", "expected"),
+    [
+        (int, "integer"),
+        (list[str], "array"),
+        (Optional[bool], "boolean"),  # noqa: UP007
+        (float | None, "number"),
+        (dict[str, str] | None, "string"),
+        (Union[int, str], "string"),  # noqa: UP007
+    ],
+)
+def test_annotation_json_type(annotation: Any, expected: str) -> None:
+    """Test mapping parameter annotations to JSON Schema types."""
+    assert _annotation_json_type(annotation) == expected